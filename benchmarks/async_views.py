@@ -0,0 +1,79 @@
+"""
+Compare the latency of the season detail and head-to-head pages under WSGI and ASGI.
+
+The sync views are requested through Django's WSGI handler and the async views through
+its ASGI handler (the test clients), against a generated league. Each page is measured
+cold (no cached fragments) and warm, without the 304 shortcut.
+
+Usage: python benchmarks/async_views.py [--players 40] [--matches 4000] [--repeat 50]
+"""
+
+import argparse
+import importlib
+from pathlib import Path
+
+from common import ROOT, benchmark_database, commit, measure, summarize, write_results
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches, reverse
+
+from ligapp.synthetic import LeagueSize, generate_league
+
+
+def client_for(async_views: bool, user: User):
+    """Get a logged-in request function for the WSGI or the ASGI handler."""
+    with override_settings(LIGAPP_ASYNC_VIEWS=async_views):
+        importlib.reload(importlib.import_module("ligapp.urls"))
+        importlib.reload(importlib.import_module("miniliga.urls"))
+    clear_url_caches()
+    if async_views:
+        client = AsyncClient()
+        async_to_sync(client.aforce_login)(user)
+        return async_to_sync(client.get)
+    client = Client()
+    client.force_login(user)
+    return client.get
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--matches", type=int, default=4000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", type=Path, help="Result file.")
+    args = parser.parse_args()
+    size = LeagueSize(players=args.players, matches=args.matches)
+
+    results = {}
+    with benchmark_database():
+        (season,) = generate_league(size, prefix="Benchmark")
+        admin = User.objects.create(username="benchmark", is_staff=True)
+        first, second = season.ranks.order_by("rank").values_list("player_id", flat=True)[:2]
+        urls = {
+            "season_detail": reverse("ligapp:season-detail", kwargs={"pk": season.pk}),
+            "head2head": reverse("ligapp:head2head", kwargs={"first": first, "second": second}),
+        }
+        for handler, async_views in (("wsgi", False), ("asgi", True)):
+            get = client_for(async_views, admin)
+            for page, url in urls.items():
+                for temperature, setup in (("cold", cache.clear), ("warm", None)):
+                    timings = measure(lambda: get(url), args.repeat, setup)  # noqa: B023
+                    results[f"{page}.{temperature}.{handler}"] = summarize(timings)
+
+    print(f"{'page':<22}{'WSGI median':>12}{'ASGI median':>12}{'WSGI p95':>10}{'ASGI p95':>10}")
+    for name in (name.removesuffix(".wsgi") for name in results if name.endswith(".wsgi")):
+        wsgi, asgi = results[f"{name}.wsgi"], results[f"{name}.asgi"]
+        print(
+            f"{name:<22}{wsgi['median_ms']:>12.2f}{asgi['median_ms']:>12.2f}"
+            f"{wsgi['p95_ms']:>10.2f}{asgi['p95_ms']:>10.2f}"
+        )
+    output = args.output or ROOT / "benchmarks" / "results" / f"async-{commit() or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    write_results(output, "async_views", {**vars(size), "repeat": args.repeat}, results)
+    print(f"\nwrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Shared set up, timing and result files of the benchmarks."""
+
+import contextlib
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "miniliga.test_settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "select2": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@contextlib.contextmanager
+def benchmark_database() -> Iterator[None]:
+    """Run against a throwaway test database and a process-local cache."""
+    setup_test_environment()
+    with override_settings(CACHES=LOCMEM_CACHES):
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def measure(
+    func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None
+) -> list[float]:
+    """Time ``repeat`` calls of ``func`` in milliseconds, after a warm-up call."""
+    timings = []
+    for _ in range(repeat + 1):
+        if setup is not None:
+            setup()
+        begin = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - begin) * 1000)
+    return timings[1:]
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "runs": len(ordered),
+        "min_ms": ordered[0],
+        "median_ms": statistics.median(ordered),
+        "mean_ms": statistics.fmean(ordered),
+        "p95_ms": ordered[int(0.95 * (len(ordered) - 1))],
+    }
+
+
+def _git(*args: str) -> str:
+    command = ["git", *args]
+    return subprocess.check_output(command, cwd=ROOT, text=True).strip()  # noqa: S603
+
+
+def commit() -> Optional[str]:
+    """The current git commit, marked as dirty if the working tree has changes."""
+    try:
+        sha = _git("rev-parse", "--short", "HEAD")
+        dirty = _git("status", "--porcelain", "--untracked-files=no")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return f"{sha}-dirty" if dirty else sha
+
+
+def write_results(
+    path: Path, suite: str, parameters: dict[str, Any], results: dict[str, dict]
+) -> None:
+    """Write the results with what is needed to compare them to other runs."""
+    data = {
+        "suite": suite,
+        "commit": commit(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "parameters": parameters,
+        "results": results,
+    }
+    path.write_text(json.dumps(data, indent=2) + "\n")
+
+
+def print_results(results: dict[str, dict[str, float]]) -> None:
+    print(f"{'benchmark':<32}{'median ms':>11}{'p95 ms':>10}{'min ms':>10}")
+    for name, result in results.items():
+        print(
+            f"{name:<32}{result['median_ms']:>11.2f}{result['p95_ms']:>10.2f}"
+            f"{result['min_ms']:>10.2f}"
+        )
+
+
+def compare(baseline_path: Path, results: dict[str, dict[str, float]], threshold: float) -> int:
+    """Print the median change against an earlier result file, count the regressions."""
+    baseline = json.loads(baseline_path.read_text())
+    print(f"\ncompared to {baseline_path} ({baseline.get('commit')}):")
+    regressions = 0
+    for name, result in results.items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["median_ms"] / baseline["results"][name]["median_ms"]
+        regressed = ratio > 1 + threshold
+        regressions += regressed
+        print(f"{name:<32}{ratio:>10.2f}x{'  REGRESSION' if regressed else ''}")
+    return regressions
@@ -0,0 +1,120 @@
+"""
+Time the hot paths of the league on a generated league of configurable size.
+
+Writes the results as JSON (by default to benchmarks/results/<commit>.json) and compares
+them to an earlier result file with --compare, exiting with an error on regressions.
+
+Usage: python benchmarks/run.py [--players 40] [--seasons 2] [--matches 2000] [--repeat 30]
+                                [--compare benchmarks/results/abc1234.json]
+"""
+
+import argparse
+import random
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+from common import (
+    ROOT,
+    benchmark_database,
+    commit,
+    compare,
+    measure,
+    print_results,
+    summarize,
+    write_results,
+)
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from ligapp import models
+from ligapp.match_builder import MatchBuilder
+from ligapp.stats import Head2Head
+from ligapp.synthetic import LeagueSize, generate_league
+
+
+def rolled_back(func: Callable[[], Any]) -> Callable[[], None]:
+    """Run a write in a transaction that is rolled back, so every run sees the same data."""
+
+    def run():
+        with transaction.atomic():
+            func()
+            transaction.set_rollback(True)
+
+    return run
+
+
+def hot_paths(season: models.Season, admin: User, rng: random.Random) -> dict[str, Callable]:
+    """The benchmarks as functions to time, with an optional set up run before each."""
+    players = list(season.participants.all())
+    top, second = (rank.player for rank in season.ranking[:2])
+    client = Client()
+    client.force_login(admin)
+
+    def build():
+        first_player, second_player = rng.sample(players, 2)
+        MatchBuilder(
+            season=season, first_player=first_player, second_player=second_player
+        ).add_score(21, 15).add_score(17, 21).add_score(21, 19).build()
+
+    def update_rank():
+        season.update_rank(rng.choice(players), rng.randrange(1, len(players) + 1))
+
+    def view(name):
+        url = reverse(name, kwargs={"pk": season.pk})
+        return lambda: client.get(url)
+
+    return {
+        "match_builder.build": (rolled_back(build), None),
+        "season.update_rank": (rolled_back(update_rank), None),
+        "head2head.stats": (lambda: Head2Head(top, second, admin).stats, None),
+        "view.season_detail": (view("ligapp:season-detail"), cache.clear),
+        "view.season_ranking": (view("ligapp:season-ranking"), cache.clear),
+        "view.season_match_history": (view("ligapp:season-match-history"), cache.clear),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--matches", type=int, default=2000, help="Per season.")
+    parser.add_argument("--max-sets", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--only", help="Only run the benchmarks with this in their name.")
+    parser.add_argument("--output", type=Path, help="Result file.")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare to.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Slowdown counted as regression."
+    )
+    args = parser.parse_args()
+    size = LeagueSize(
+        players=args.players, seasons=args.seasons, matches=args.matches, max_sets=args.max_sets
+    )
+
+    with benchmark_database():
+        seasons = generate_league(size, prefix="Benchmark")
+        admin = User.objects.create(username="benchmark", is_staff=True)
+        benchmarks = hot_paths(seasons[-1], admin, random.Random(1))  # noqa: S311
+        results = {}
+        for name, (func, setup) in benchmarks.items():
+            if args.only and args.only not in name:
+                continue
+            results[name] = summarize(measure(func, args.repeat, setup))
+
+    print_results(results)
+    regressions = compare(args.compare, results, args.threshold) if args.compare else 0
+    output = args.output or ROOT / "benchmarks" / "results" / f"{commit() or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    parameters = {**vars(size), "repeat": args.repeat}
+    write_results(output, "hot_paths", parameters, results)
+    print(f"\nwrote {output}")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
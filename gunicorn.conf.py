@@ -0,0 +1,29 @@
+"""
+Gunicorn settings, read automatically from the working directory.
+
+The workers write their Prometheus metrics to ``PROMETHEUS_MULTIPROC_DIR`` so ``/metrics``
+reports all of them, see ``ligapp.metrics``.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", str(Path(tempfile.gettempdir()) / "miniliga-metrics")
+)
+
+
+def on_starting(server):
+    """Start with empty metrics, the files of an earlier run would be added up."""
+    directory = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+    shutil.rmtree(directory, ignore_errors=True)
+    directory.mkdir(parents=True)
+
+
+def child_exit(server, worker):
+    """Stop reporting the live gauges of a worker that is gone."""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
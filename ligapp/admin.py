@@ -7,7 +7,8 @@ from .models import (
     MultiSetMatch,
     Player,
     Rank,
-    RankingHistory,
+    RankEvent,
+    Rating,
     Season,
     Set,
     TimedMatch,
@@ -15,11 +16,9 @@ from .models import (
 
 admin.site.register(Season)
 admin.site.register(Player)
-admin.site.register(Match)
-admin.site.register(TimedMatch)
-admin.site.register(Set)
 admin.site.register(Rank)
-admin.site.register(RankingHistory)
+admin.site.register(RankEvent)
+admin.site.register(Rating)
 
 
 class SetInline(admin.TabularInline):
@@ -28,8 +27,24 @@ class SetInline(admin.TabularInline):
     model = Set
 
 
-@admin.register(MultiSetMatch)
-class MultiSetMatchAdmin(admin.ModelAdmin):
-    """Admin editor for multi set matches."""
+class MatchResultAdmin(admin.ModelAdmin):
+    """
+    Admin editor for matches, with their sets inline.
+
+    Sets are only edited here and not on their own, so the stored result is always updated
+    after them.
+    """
 
     inlines = [SetInline]
+
+    def save_related(self, request, form, formsets, change):
+        """Update the stored result after the sets were saved, by the rules of the match type."""
+        super().save_related(request, form, formsets, change)
+        match = form.instance.child
+        match.update_result()
+        match.save(update_fields=Match.RESULT_FIELDS)
+
+
+admin.site.register(Match, MatchResultAdmin)
+admin.site.register(MultiSetMatch, MatchResultAdmin)
+admin.site.register(TimedMatch, MatchResultAdmin)
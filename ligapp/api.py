@@ -0,0 +1,181 @@
+"""
+Read-only JSON API for seasons, rankings, matches and head-to-head stats.
+
+Every endpoint sends an ETag derived from the season versions (see ``ligapp.caching``), so
+polling clients get a 304 Not Modified without the data being loaded when nothing changed.
+"""
+
+import functools
+import hashlib
+import json
+from typing import Any, Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.views.decorators.http import condition, require_safe
+
+from .caching import season_version, season_versions
+from .models import Match, Player, Rank, Season
+from .stats import Head2Head
+
+
+def api_login_required(view):
+    """Answer unauthenticated requests with a JSON 403 instead of a login redirect."""
+
+    @functools.wraps(view)
+    def wrapper(request: HttpRequest, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({"detail": "Authentication required."}, status=403)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+def _digest(*parts: Any) -> str:
+    return hashlib.sha1(repr(parts).encode(), usedforsecurity=False).hexdigest()
+
+
+def _stream_list(items: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Encode a JSON array item by item."""
+    yield "["
+    for index, item in enumerate(items):
+        yield ("," if index else "") + json.dumps(item, cls=DjangoJSONEncoder)
+    yield "]"
+
+
+def player_data(player: Player) -> dict[str, Any]:
+    return {"id": player.pk, "name": player.name}
+
+
+def season_data(season: Season) -> dict[str, Any]:
+    return {
+        "id": season.pk,
+        "name": season.name,
+        "start_date": season.start_date,
+        "end_date": season.end_date,
+        "url": reverse("ligapp:api-season", kwargs={"pk": season.pk}),
+    }
+
+
+def match_data(match: Match) -> dict[str, Any]:
+    """Serialize a match loaded with ``MatchQuerySet.with_details``."""
+    return {
+        "id": match.pk,
+        "type": match.match_type,
+        "completed": match.completed,
+        "date_played": match.date_played,
+        "date_planned": match.date_planned,
+        "minutes_played": getattr(match.child, "minutes_played", None),
+        "first_player": player_data(match.first_player),
+        "second_player": player_data(match.second_player),
+        "winner": match.winner_id,
+        "sets": [[score_set.first_score, score_set.second_score] for score_set in match.sets.all()],
+        "sets_won": [match.first_sets_won, match.second_sets_won],
+        "points": [match.first_points, match.second_points],
+    }
+
+
+def rank_data(rank: Rank) -> dict[str, Any]:
+    """Serialize a rank loaded with ``Season.ranking``."""
+    return {"rank": rank.rank, "player": player_data(rank.player), "rating": rank.rating}
+
+
+def _seasons_etag(request: HttpRequest) -> str:
+    season_pks = Season.objects.for_user(request.user).values_list("pk", flat=True)
+    return _digest(request.user.pk, sorted(season_versions(season_pks).items()))
+
+
+@api_login_required
+@require_safe
+@condition(etag_func=_seasons_etag)
+def seasons(request: HttpRequest) -> JsonResponse:
+    """List the seasons the user administers or plays in."""
+    data = [
+        {
+            **season_data(season),
+            "is_admin": season.is_admin,
+            "is_participant": season.is_participant,
+        }
+        for season in Season.objects.for_user(request.user).order_by("pk")
+    ]
+    return JsonResponse(data, safe=False)
+
+
+def _season_etag(request: HttpRequest, pk: int) -> str:
+    return f"season-{pk}-{season_version(pk)}"
+
+
+@api_login_required
+@require_safe
+@condition(etag_func=_season_etag)
+def season(request: HttpRequest, pk: int) -> JsonResponse:
+    """Show a season with its participants."""
+    season = get_object_or_404(Season, pk=pk)
+    data = {
+        **season_data(season),
+        "participants": [player_data(player) for player in season.participants.all()],
+        "ranking_url": reverse("ligapp:api-season-ranking", kwargs={"pk": pk}),
+        "matches_url": reverse("ligapp:api-season-matches", kwargs={"pk": pk}),
+    }
+    return JsonResponse(data)
+
+
+@api_login_required
+@require_safe
+@condition(etag_func=_season_etag)
+def season_ranking(request: HttpRequest, pk: int) -> JsonResponse:
+    """List the full ranking of a season, with the players' ratings."""
+    season = get_object_or_404(Season, pk=pk)
+    data = [rank_data(rank) for rank in season.ranking]
+    return JsonResponse(data, safe=False)
+
+
+@api_login_required
+@require_safe
+@condition(etag_func=_season_etag)
+def season_matches(request: HttpRequest, pk: int) -> StreamingHttpResponse:
+    """
+    Stream the completed matches of a season, newest first.
+
+    With ``?status=planned`` the planned matches are listed instead, by planned date.
+    """
+    season = get_object_or_404(Season, pk=pk)
+    if request.GET.get("status") == "planned":
+        matches = season.matches.filter(completed=False).order_by("date_planned", "pk")
+    else:
+        matches = season.matches.filter(completed=True).order_by("-date_played", "-pk")
+    matches = matches.with_details().iterator(chunk_size=500)
+    return StreamingHttpResponse(
+        _stream_list(match_data(match) for match in matches),
+        content_type="application/json",
+    )
+
+
+def _head2head_etag(request: HttpRequest, first: int, second: int) -> str:
+    h2h = Head2Head(Player(pk=first), Player(pk=second), request.user)
+    return f"head2head-{first}-{second}-{request.user.pk}-{h2h.version()}"
+
+
+@api_login_required
+@require_safe
+@condition(etag_func=_head2head_etag)
+def head2head(request: HttpRequest, first: int, second: int) -> JsonResponse:
+    """Show the head-to-head stats of two players in the seasons the user administers."""
+    h2h = Head2Head(
+        get_object_or_404(Player, pk=first), get_object_or_404(Player, pk=second), request.user
+    )
+    totals = h2h.totals()
+    data = {
+        "players": [player_data(h2h.first), player_data(h2h.second)],
+        "matches": totals["matches"],
+        "wins": [totals["first_wins"], totals["second_wins"]],
+        "sets": [totals["first_sets"], totals["second_sets"]],
+        "points": [totals["first_won_points"], totals["second_won_points"]],
+        "seasons": [
+            {**season_data(season), "ranks": [first_rank, second_rank]}
+            for season, first_rank, second_rank in h2h.season_stats
+        ],
+    }
+    return JsonResponse(data)
@@ -8,3 +8,7 @@ class LigappConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "ligapp"
+
+    def ready(self):
+        """Connect the cache invalidation and query metrics signal handlers."""
+        from . import metrics, signals  # noqa: F401
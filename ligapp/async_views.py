@@ -0,0 +1,106 @@
+"""
+Async versions of the season detail and head-to-head pages, for serving under ASGI.
+
+They render the same templates as the views in ``ligapp.views`` but load the data for
+the page sections with independent async queries, gathered concurrently, before rendering.
+Enabled with the ``LIGAPP_ASYNC_VIEWS`` setting (see ``ligapp.urls``).
+"""
+
+import asyncio
+import inspect
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.views import redirect_to_login
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.shortcuts import aget_object_or_404, render
+from django.views import View
+from django.views.decorators.http import condition
+
+from .caching import season_version
+from .models import Player, Season
+from .stats import Head2Head
+from .views import Head2HeadConditionalGetMixin, SeasonConditionalGetMixin, SeasonFragmentCacheMixin
+
+
+class AsyncConditionalPageView(View):
+    """
+    Async counterpart of ``LoginRequiredMixin`` with a ``ConditionalGetMixin``.
+
+    The validators are computed before ``condition`` runs, so that the (sync) cache and
+    database lookups behind them can be awaited. Subclasses must implement the async
+    ``get_page``, which is checked when they are defined.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        """Refuse subclasses without an async ``get_page``."""
+        super().__init_subclass__(**kwargs)
+        if not inspect.iscoroutinefunction(getattr(cls, "get_page", None)):
+            raise TypeError(f"{cls.__name__} must implement 'async def get_page'.")
+
+    async def get(self, request, *args, **kwargs):
+        """Redirect anonymous users, answer 304 if unchanged, else render the page."""
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        etag, last_modified = await sync_to_async(self._validators)(request, *args, **kwargs)
+        page = condition(
+            etag_func=lambda *args, **kwargs: etag,
+            last_modified_func=lambda *args, **kwargs: last_modified,
+        )(self.get_page)
+        return await page(request, *args, **kwargs)
+
+    def _validators(self, request, *args, **kwargs):
+        # One thread switch for both, they are cheap but sync (cache and session lookups).
+        return (
+            self._user_etag(request, *args, **kwargs),
+            self.get_last_modified(request, *args, **kwargs),
+        )
+
+
+class AsyncSeasonDetailView(AsyncConditionalPageView, SeasonConditionalGetMixin):
+    """Display a season, loading the uncached page sections concurrently."""
+
+    template_name = "ligapp/season_detail.html"
+    fragment_cache_timeout = SeasonFragmentCacheMixin.fragment_cache_timeout
+    # The template fragments and the season properties they display.
+    fragments = {
+        "season-planned-matches": "planned_matches",
+        "season-latest-matches": "latest_matches",
+        "season-top-16": "top_16",
+    }
+
+    def get_etag(self, request, *args, **kwargs):
+        # Same validator as the sync view, switching between them keeps client caches valid.
+        return f"SeasonDetailView-{kwargs['pk']}-{season_version(kwargs['pk'])}"
+
+    async def get_page(self, request, pk):
+        season = await aget_object_or_404(Season, pk=pk)
+        version = await sync_to_async(season_version)(pk)
+        keys = {
+            make_template_fragment_key(fragment, [pk, version]): name
+            for fragment, name in self.fragments.items()
+        }
+        cached = await cache.aget_many(keys)
+        await season.apreload(*(name for key, name in keys.items() if key not in cached))
+        context = {
+            "season": season,
+            "object": season,
+            "season_version": version,
+            "fragment_cache_timeout": self.fragment_cache_timeout,
+        }
+        return await sync_to_async(render)(request, self.template_name, context)
+
+
+class AsyncHead2HeadView(AsyncConditionalPageView, Head2HeadConditionalGetMixin):
+    """Head-to-Head view for two players, loading the stats concurrently."""
+
+    template_name = "ligapp/head_to_head.html"
+
+    async def get_page(self, request, first, second):
+        first, second = await asyncio.gather(
+            aget_object_or_404(Player, pk=first), aget_object_or_404(Player, pk=second)
+        )
+        h2hstats = Head2Head(first, second, request.user)
+        await h2hstats.apreload()
+        return await sync_to_async(render)(request, self.template_name, {"h2hstats": h2hstats})
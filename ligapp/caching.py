@@ -0,0 +1,59 @@
+"""Versioning for the cached fragments of season pages."""
+
+import time
+from typing import Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+
+#: Sent with ``season_pk`` after a season moved to a new version in this process.
+season_changed = Signal()
+
+
+def _season_version_key(season_pk: int) -> str:
+    return f"ligapp:season-version:{season_pk}"
+
+
+def season_version(season_pk: int) -> int:
+    """
+    Get the current version of a season's cached fragments.
+
+    A missing version starts at the current time, so it never goes back to a version
+    for which stale fragments might still be cached.
+    """
+    key = _season_version_key(season_pk)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_season_version(season_pk: int) -> None:
+    """Invalidate a season's cached fragments once the current transaction is committed."""
+    transaction.on_commit(lambda: _bump(season_pk))
+
+
+def _bump(season_pk: int) -> None:
+    """
+    Move the season to a new version.
+
+    Only an atomic ``incr`` is safe for concurrent bumps, which the shared cache backends do
+    not provide. Instead every bump sets a new version from the clock, so two concurrent
+    bumps can not end up on the same version as long as they are at least 1ns apart.
+    """
+    key = _season_version_key(season_pk)
+    current = cache.get(key) or 0
+    cache.set(key, max(time.time_ns(), current + 1), timeout=None)
+    season_changed.send(sender=None, season_pk=season_pk)
+
+
+def season_versions(season_pks: Iterable[int]) -> dict[int, int]:
+    """Get the current versions of many seasons, in one round trip if they are all set."""
+    keys = {_season_version_key(season_pk): season_pk for season_pk in season_pks}
+    found = cache.get_many(keys)
+    return {
+        season_pk: found[key] if key in found else season_version(season_pk)
+        for key, season_pk in keys.items()
+    }
@@ -0,0 +1,195 @@
+"""Bulk import of match results from CSV or JSON lines."""
+
+import csv
+import datetime
+import json
+from typing import IO, Any, Iterable, Iterator, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from . import models
+from .match_builder import MatchBuilder, bulk_build
+from .match_form import MatchRulesMixin, NewMatchForm
+from .ranking import Ladder
+from .rating import recompute
+
+RowErrors = dict[str, list[str]]
+
+
+def read_rows(stream: IO[str], file_format: str) -> Iterator[dict[str, Any]]:
+    """Read the rows one by one from a CSV or TSV file with a header line or a JSON lines file."""
+    if file_format == "csv":
+        yield from csv.DictReader(stream)
+    elif file_format == "tsv":
+        yield from csv.DictReader(stream, dialect="excel-tab")
+    elif file_format == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+
+
+class MatchRowValidator(MatchRulesMixin):
+    """
+    Validate rows with the fields and rules of ``NewMatchForm``.
+
+    Players are given by name and the season by pk. Seasons, players and participants are
+    looked up once and kept, so validating a row does not need any queries.
+    """
+
+    fields = {
+        name: field
+        for name, field in NewMatchForm.base_fields.items()
+        if name not in {"season", "first_player", "second_player"}
+    }
+
+    def __init__(self, season: Optional[models.Season] = None):
+        """Use ``season`` for rows that do not name one."""
+        self.default_season = season
+        self.errors: RowErrors = {}
+        self._players: Optional[dict[str, models.Player]] = None
+        self._seasons: dict[str, Optional[models.Season]] = {}
+        self._participants: dict[int, set[models.Player]] = {}
+
+    def add_error(self, field: str, error: ValidationError) -> None:
+        """Collect the error messages per field, like a form does."""
+        self.errors.setdefault(field, []).extend(error.messages)
+
+    def get_participants(self, season: models.Season) -> set[models.Player]:
+        """Get the participants of ``season`` from memory."""
+        if season.pk not in self._participants:
+            self._participants[season.pk] = set(season.participants.all())
+        return self._participants[season.pk]
+
+    def clean(self, row: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """Get the cleaned values of a row, or None if there are errors."""
+        self.errors = {}
+        cleaned_data: dict[str, Any] = {}
+        row = {**row, "match_type": row.get("match_type") or models.Match.MatchType.SETS}
+        for name, field in self.fields.items():
+            try:
+                cleaned_data[name] = field.clean(row.get(name))
+            except ValidationError as err:
+                self.add_error(name, err)
+        self._clean_season(row.get("season"), cleaned_data)
+        for name in ("first_player", "second_player"):
+            self._clean_player(name, row.get(name), cleaned_data)
+        self.validate_match(cleaned_data)
+        return None if self.errors else cleaned_data
+
+    def _clean_season(self, value: Any, cleaned_data: dict[str, Any]) -> None:
+        if value in (None, ""):
+            if self.default_season is None:
+                self.add_error("season", ValidationError(_("This field is required.")))
+            cleaned_data["season"] = self.default_season
+            return
+        key = str(value)
+        if key not in self._seasons:
+            self._seasons[key] = (
+                models.Season.objects.filter(pk=int(key)).first() if key.isdigit() else None
+            )
+        if self._seasons[key] is None:
+            self.add_error("season", ValidationError(_("Unknown season.")))
+        cleaned_data["season"] = self._seasons[key]
+
+    def _clean_player(self, name: str, value: Any, cleaned_data: dict[str, Any]) -> None:
+        if self._players is None:
+            self._players = models.Player.objects.in_bulk(field_name="name")
+        if value in (None, ""):
+            self.add_error(name, ValidationError(_("This field is required.")))
+        elif value not in self._players:
+            self.add_error(name, ValidationError(_("Unknown player.")))
+        else:
+            cleaned_data[name] = self._players[value]
+
+
+def make_builder(cleaned_data: dict[str, Any]) -> MatchBuilder:
+    """Set up a builder from validated values, the same way ``NewMatchView`` does."""
+    date_played = cleaned_data["date_played"]
+    if not isinstance(date_played, datetime.datetime):
+        date_played = datetime.datetime.combine(date_played, datetime.time())
+    if timezone.is_naive(date_played):
+        date_played = timezone.make_aware(date_played)
+    builder = MatchBuilder(
+        season=cleaned_data["season"],
+        first_player=cleaned_data["first_player"],
+        second_player=cleaned_data["second_player"],
+        date_played=date_played,
+        minutes_played=cleaned_data["minutes_played"],
+    ).set_type_from_enum_value(cleaned_data["match_type"])
+    for i in range(1, 4):
+        builder.add_score(cleaned_data[f"first_score_{i}"], cleaned_data[f"second_score_{i}"])
+    return builder
+
+
+class InvalidRowsError(Exception):
+    """Error for an import with invalid rows, carrying the row numbers and their errors."""
+
+    def __init__(self, errors: list[tuple[int, RowErrors]]):
+        """Keep the errors for reporting."""
+        super().__init__(f"{len(errors)} invalid rows")
+        self.errors = errors
+
+
+class MatchImporter:
+    """
+    Import matches in batches, updating the ranking and ratings of each season once at the end.
+
+    The results are applied to the ranking in the order of the rows, so the outcome is the
+    same as recording the matches one by one. Only one batch is held in memory at a time.
+    """
+
+    def __init__(
+        self,
+        season: Optional[models.Season] = None,
+        batch_size: int = 1000,
+        skip_invalid: bool = False,
+    ):
+        """Set up the validator, see ``MatchRowValidator`` for ``season``."""
+        self.validator = MatchRowValidator(season)
+        self.batch_size = batch_size
+        self.skip_invalid = skip_invalid
+        self.errors: list[tuple[int, RowErrors]] = []
+        self.imported = 0
+        self._ladders: dict[int, Ladder] = {}
+
+    def run(self, rows: Iterable[dict[str, Any]]) -> None:
+        """
+        Validate and import all rows in one transaction.
+
+        Raises ``InvalidRowsError`` for any invalid row, after validating all of them,
+        unless invalid rows are skipped.
+        """
+        batch: list[MatchBuilder] = []
+        with transaction.atomic():
+            for row_nr, row in enumerate(rows, start=1):
+                cleaned_data = self.validator.clean(row)
+                if cleaned_data is None:
+                    self.errors.append((row_nr, self.validator.errors))
+                    continue
+                if self.errors and not self.skip_invalid:
+                    continue
+                batch.append(make_builder(cleaned_data))
+                if len(batch) >= self.batch_size:
+                    self._import_batch(batch)
+                    batch = []
+            if self.errors and not self.skip_invalid:
+                raise InvalidRowsError(self.errors)
+            self._import_batch(batch)
+            for ladder in self._ladders.values():
+                ladder.save()
+                recompute(ladder.season)
+
+    def _import_batch(self, batch: list[MatchBuilder]) -> None:
+        matches = bulk_build(batch)
+        for match in matches:
+            if match.season_id not in self._ladders:
+                self._ladders[match.season_id] = Ladder.load(match.season)
+            self._ladders[match.season_id].apply_result(
+                match.first_player_id, match.second_player_id, match.winner_id
+            )
+        self.imported += len(matches)
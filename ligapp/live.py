@@ -0,0 +1,217 @@
+"""
+Live updates of season pages, pushed to the browser as server-sent events.
+
+Each season with connected clients has one ``SeasonFeed`` per process. It watches the
+season's cache version (see ``ligapp.caching``), loads what changed once and fans it out
+to all of its clients, so the database load does not grow with the number of screens.
+A version bump in the same process wakes the feed right away, bumps from other processes
+are noticed with the next poll of the shared cache.
+
+The stream is open for as long as the page, which is only reasonable under ASGI. The view
+is only mounted with the ``LIGAPP_LIVE_UPDATES`` setting.
+"""
+
+import asyncio
+import dataclasses
+import json
+import logging
+from typing import Any, AsyncIterator, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Max, Q
+from django.dispatch import receiver
+from django.http import HttpRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.views.decorators.http import require_safe
+
+from .api import match_data, rank_data
+from .caching import season_changed, season_version
+from .models import Match, Season
+
+KEEPALIVE_INTERVAL = 15.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass
+class Event:
+    """A server-sent event with a JSON payload."""
+
+    name: str
+    data: Any
+
+    def encode(self) -> str:
+        return f"event: {self.name}\ndata: {json.dumps(self.data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class SeasonFeed:
+    """
+    Watch a season and publish its new results and ranking changes to the subscribers.
+
+    Every subscriber gets a bounded queue. A client too slow to keep up gets a ``reload``
+    event instead of the events it missed. If the feed fails, its subscribers get a
+    ``reload`` event and their streams end, the clients reconnect to a new feed.
+
+    New results are the completed matches after the highest pk seen so far, and the
+    planned matches seen before that are completed now.
+    """
+
+    feeds: dict[int, "SeasonFeed"] = {}
+    queue_size = 100
+
+    def __init__(self, season_pk: int):
+        """Create the feed, it starts watching with the first subscriber."""
+        self.season_pk = season_pk
+        self.subscribers: set[asyncio.Queue] = set()
+        self.poll_interval = getattr(settings, "LIGAPP_LIVE_POLL_INTERVAL", 2.0)
+        self._last_result = 0
+        self._planned: set[int] = set()
+        self._ranking: list[dict[str, Any]] = []
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def of_season(cls, season_pk: int) -> "SeasonFeed":
+        """Get the feed of a season, creating it if nobody watches the season yet."""
+        if season_pk not in cls.feeds:
+            cls.feeds[season_pk] = cls(season_pk)
+        return cls.feeds[season_pk]
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        if self._task is None:
+            self._task = self._loop.create_task(self.run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Remove a subscriber, the last one stops the feed."""
+        self.subscribers.discard(queue)
+        if not self.subscribers:
+            if self._task is not None:
+                self._task.cancel()
+            self._forget()
+
+    def close(self) -> None:
+        """Stop publishing, telling the subscribers to reload and ending their streams."""
+        self._forget()
+        for queue in self.subscribers:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(Event("reload", None))
+            queue.put_nowait(None)
+
+    def _forget(self) -> None:
+        if self.feeds.get(self.season_pk) is self:
+            del self.feeds[self.season_pk]
+
+    def wake(self) -> None:
+        """Check for changes now instead of at the next poll, from any thread."""
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self) -> None:
+        """Publish the changes whenever the season version moves, until cancelled or failed."""
+        try:
+            await self._watch()
+        except Exception:
+            logger.exception("The live feed of season %s failed.", self.season_pk)
+            self.close()
+
+    async def _watch(self) -> None:
+        version = await sync_to_async(self._snapshot)()
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if await sync_to_async(season_version)(self.season_pk) != version:
+                version, events = await sync_to_async(self._changes)()
+                self.publish(events)
+
+    def publish(self, events: list[Event]) -> None:
+        for queue in self.subscribers:
+            if queue.qsize() + len(events) > queue.maxsize:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(Event("reload", None))
+                continue
+            for event in events:
+                queue.put_nowait(event)
+
+    def _snapshot(self) -> int:
+        """Remember the current results and ranking, returning the version they belong to."""
+        version = season_version(self.season_pk)
+        matches = Match.objects.filter(season_id=self.season_pk)
+        last_result = matches.filter(completed=True).aggregate(last=Max("pk"))["last"]
+        self._last_result = last_result or 0
+        self._planned = set(matches.filter(completed=False).values_list("pk", flat=True))
+        self._ranking = self._load_ranking()
+        return version
+
+    def _changes(self) -> tuple[int, list[Event]]:
+        """Load the results and the ranking if they changed since the last snapshot."""
+        last_result, planned, ranking = self._last_result, self._planned, self._ranking
+        version = self._snapshot()
+        new_results = (
+            Match.objects.filter(
+                Q(pk__gt=last_result, pk__lte=self._last_result)
+                | Q(pk__in=planned - self._planned),
+                season_id=self.season_pk,
+                completed=True,
+            )
+            .with_details()
+            .order_by("date_played", "pk")
+        )
+        events = [Event("result", match_data(match)) for match in new_results]
+        if self._ranking != ranking:
+            events.append(Event("ranking", self._ranking))
+        return version, events
+
+    def _load_ranking(self) -> list[dict[str, Any]]:
+        return [rank_data(rank) for rank in Season(pk=self.season_pk).ranking]
+
+
+@receiver(season_changed)
+def wake_season_feed(sender, season_pk, **kwargs):
+    """Let the feed of a season in this process publish a change without waiting to poll."""
+    feed = SeasonFeed.feeds.get(season_pk)
+    if feed is not None:
+        feed.wake()
+
+
+async def _stream(season_pk: int) -> AsyncIterator[str]:
+    feed = SeasonFeed.of_season(season_pk)
+    queue = feed.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is None:
+                return
+            yield event.encode()
+    finally:
+        feed.unsubscribe(queue)
+
+
+@require_safe
+async def season_events(request: HttpRequest, pk: int) -> StreamingHttpResponse:
+    """
+    Stream the new results (``result``) and ranking changes (``ranking``) of a season.
+
+    The payloads are the same as in the JSON API. On ``reload`` the client missed events.
+    """
+    if not (await request.auser()).is_authenticated:
+        return HttpResponseForbidden()
+    season = await aget_object_or_404(Season, pk=pk)
+    response = StreamingHttpResponse(_stream(season.pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
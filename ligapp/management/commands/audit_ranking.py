@@ -0,0 +1,78 @@
+"""Compare the stored ranking of seasons with a replay of their matches."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ligapp import models
+from ligapp.ranking import players_without_join_event, replay
+
+
+class Command(BaseCommand):
+    """
+    Replay the completed matches of seasons and report where the stored ranks differ.
+
+    The replay starts from the order in which the players joined the season, known from
+    their first rank events. Seasons with players who joined before rank events were
+    recorded have no known start and are skipped.
+    """
+
+    help = (
+        "Replay the completed matches of seasons in date order and compare the outcome "
+        "to the stored ranking. Seasons with players who have no rank event from joining "
+        "(recorded before rank events existed) are skipped. The replay does not know about "
+        "ranks changed by hand, --fix undoes them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("seasons", nargs="*", type=int, help="Season pks (default: all).")
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Store the replayed ranks where they differ.",
+        )
+
+    def handle(self, *args, **options):
+        seasons = models.Season.objects.order_by("pk")
+        if options["seasons"]:
+            seasons = seasons.filter(pk__in=options["seasons"])
+            missing = set(options["seasons"]) - {season.pk for season in seasons}
+            if missing:
+                raise CommandError(f"Unknown seasons: {', '.join(map(str, sorted(missing)))}")
+        differing = skipped = 0
+        for season in seasons:
+            unknown_start = players_without_join_event(season)
+            if unknown_start:
+                skipped += 1
+                self.stdout.write(
+                    f"{season}: skipped, {len(unknown_start)} players joined before rank events "
+                    "were recorded, so the initial order is unknown."
+                )
+                continue
+            result = replay(season)
+            changes = result.ladder.changes()
+            if options["verbosity"] >= 2:
+                self.stdout.write(
+                    f"{season}: {len(result.history)} of the replayed matches moved players."
+                )
+            if not changes:
+                continue
+            differing += 1
+            self._report(season, result.ladder, changes)
+            if options["fix"]:
+                result.ladder.save()
+        if differing and not options["fix"]:
+            raise CommandError(f"The ranking of {differing} seasons differs from the replay.")
+        self.stdout.write(
+            f"Fixed the ranking of {differing} seasons."
+            if differing
+            else "All audited rankings match the replay."
+        )
+        if skipped:
+            self.stdout.write(f"Skipped {skipped} seasons without a known initial order.")
+
+    def _report(self, season, ladder, changes):
+        names = dict(models.Player.objects.filter(pk__in=changes).values_list("pk", "name"))
+        self.stdout.write(f"{season}:")
+        for player_pk, rank in sorted(changes.items(), key=lambda item: item[1]):
+            self.stdout.write(
+                f"  {names[player_pk]}: stored {ladder.saved_rank(player_pk)}, replay {rank}"
+            )
@@ -0,0 +1,42 @@
+"""Fill in the stored result fields of completed matches from their sets."""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ligapp import models
+
+
+class Command(BaseCommand):
+    """Backfill the winner, sets won and points columns of completed matches."""
+
+    help = "Fill in the stored result fields of completed matches from their sets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute the results of all completed matches, not only the missing ones.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        total = 0
+        for match_type in (models.MultiSetMatch, models.TimedMatch):
+            matches = match_type.objects.filter(completed=True).prefetch_related("sets")
+            if not options["all"]:
+                matches = matches.filter(first_points__isnull=True)
+            batch = []
+            for match in matches.iterator(chunk_size=batch_size):
+                match.update_result()
+                batch.append(match)
+                if len(batch) >= batch_size:
+                    total += self._save(match_type, batch)
+                    batch = []
+            total += self._save(match_type, batch)
+        self.stdout.write(f"Updated the results of {total} matches.")
+
+    def _save(self, match_type, batch) -> int:
+        with transaction.atomic():
+            match_type.objects.bulk_update(batch, models.Match.RESULT_FIELDS)
+        return len(batch)
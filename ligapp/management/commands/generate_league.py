@@ -0,0 +1,79 @@
+"""Generate a synthetic league for load testing."""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ligapp import models
+from ligapp.synthetic import LeagueGenerator, LeagueSize
+
+
+class Command(BaseCommand):
+    """
+    Fill the database with generated seasons, see ``ligapp.synthetic``.
+
+    Every season has all the players, a random initial ranking, completed matches of both
+    types with the ranking history and ratings they lead to, and planned matches.
+    """
+
+    help = "Generate players, seasons and matches in bulk, for example to load test."
+
+    def add_arguments(self, parser):
+        defaults = LeagueSize()
+        parser.add_argument("--players", type=int, default=defaults.players)
+        parser.add_argument("--seasons", type=int, default=defaults.seasons)
+        parser.add_argument(
+            "--matches", type=int, default=defaults.matches, help="Completed matches per season."
+        )
+        parser.add_argument(
+            "--planned", type=int, default=defaults.planned, help="Planned matches per season."
+        )
+        parser.add_argument(
+            "--max-sets", type=int, default=defaults.max_sets, help="Best of this many sets."
+        )
+        parser.add_argument(
+            "--timed-share",
+            type=float,
+            default=defaults.timed_share,
+            help="Share of timed matches.",
+        )
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument(
+            "--prefix", default="Synthetic", help="Start of the player and season names."
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=LeagueGenerator.batch_size,
+            help="Matches per insert, also the step of the ranking history.",
+        )
+
+    def handle(self, *args, **options):
+        if options["players"] < 2:
+            raise CommandError("A league needs at least 2 players.")
+        prefix = options["prefix"]
+        if models.Player.objects.filter(name__startswith=f"{prefix} Player ").exists():
+            raise CommandError(f"There are players named '{prefix} ...' already, use --prefix.")
+        size = LeagueSize(
+            players=options["players"],
+            seasons=options["seasons"],
+            matches=options["matches"],
+            max_sets=options["max_sets"],
+            planned=options["planned"],
+            timed_share=options["timed_share"],
+            seed=options["seed"],
+        )
+        generator = LeagueGenerator(size, prefix=prefix, batch_size=options["batch_size"])
+        start = time.perf_counter()
+        players = generator.create_players()
+        for number in range(size.seasons):
+            season_start = time.perf_counter()
+            season = generator.generate_season(players, number)
+            self.stdout.write(
+                f"{season}: {size.matches} matches, {size.planned} planned "
+                f"in {time.perf_counter() - season_start:.1f}s"
+            )
+        self.stdout.write(
+            f"Generated {size.seasons} seasons with {len(players)} players "
+            f"in {time.perf_counter() - start:.1f}s."
+        )
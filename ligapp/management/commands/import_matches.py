@@ -0,0 +1,72 @@
+"""Import completed matches from a CSV or JSON lines file."""
+
+import pathlib
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ligapp import models
+from ligapp.importing import InvalidRowsError, MatchImporter, read_rows
+
+
+class Command(BaseCommand):
+    """
+    Import match results in bulk.
+
+    Each row has the fields of the new match form, with the players given by name:
+    ``season`` (pk, optional with ``--season``), ``first_player``, ``second_player``,
+    ``match_type`` ("Points" or "Time", default "Points"), ``minutes_played``,
+    ``date_played`` and ``first_score_1`` to ``second_score_3``.
+    """
+
+    help = "Import completed matches from a CSV or JSON lines file ('-' for stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("file")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "tsv", "jsonl"],
+            help="File format, guessed from the file extension if not given.",
+        )
+        parser.add_argument("--season", type=int, help="Season (pk) of rows without a season.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--skip-invalid",
+            action="store_true",
+            help="Import the valid rows and skip the invalid ones instead of importing nothing.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["file"]
+        suffix = pathlib.Path(path).suffix
+        file_format = options["format"] or (
+            "jsonl" if suffix in {".jsonl", ".ndjson"} else "tsv" if suffix == ".tsv" else "csv"
+        )
+        season = None
+        if options["season"] is not None:
+            season = models.Season.objects.filter(pk=options["season"]).first()
+            if season is None:
+                raise CommandError(f"Season {options['season']} does not exist.")
+        importer = MatchImporter(
+            season=season,
+            batch_size=options["batch_size"],
+            skip_invalid=options["skip_invalid"],
+        )
+        try:
+            if path == "-":
+                importer.run(read_rows(sys.stdin, file_format))
+            else:
+                with open(path, newline="", encoding="utf-8") as stream:
+                    importer.run(read_rows(stream, file_format))
+        except InvalidRowsError as err:
+            self._report(err.errors)
+            raise CommandError(f"Nothing imported, {len(err.errors)} rows are invalid.") from err
+        self._report(importer.errors)
+        self.stdout.write(
+            f"Imported {importer.imported} matches, skipped {len(importer.errors)} invalid rows."
+        )
+
+    def _report(self, errors):
+        for row_nr, row_errors in errors:
+            for field, messages in row_errors.items():
+                self.stderr.write(f"Row {row_nr}, {field}: {' '.join(messages)}")
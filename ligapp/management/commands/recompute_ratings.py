@@ -0,0 +1,63 @@
+"""Recompute the skill ratings of seasons from their matches."""
+
+import dataclasses
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ligapp import models
+from ligapp.rating import EloParameters, recompute
+
+
+class Command(BaseCommand):
+    """Recompute the Elo ratings of seasons, for example after changing the parameters."""
+
+    help = "Recompute the skill ratings of seasons from all their completed matches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("seasons", nargs="*", type=int, help="Season pks (default: all).")
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only seasons with completed matches but no ratings yet.",
+        )
+        parser.add_argument(
+            "--initial", type=float, help="Override the initial rating, needs --dry-run."
+        )
+        parser.add_argument(
+            "--k-factor", type=float, help="Override the K-factor, needs --dry-run."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show the recomputed ratings without saving them.",
+        )
+
+    def handle(self, *args, **options):
+        parameters = EloParameters.from_settings()
+        overrides = {
+            name: options[name] for name in ("initial", "k_factor") if options[name] is not None
+        }
+        if overrides and not options["dry_run"]:
+            # new matches are rated with the parameters of the settings
+            raise CommandError(
+                "Overridden parameters can only be tried with --dry-run, "
+                "change the LIGAPP_ELO setting to rate with them."
+            )
+        parameters = dataclasses.replace(parameters, **overrides)
+        seasons = models.Season.objects.order_by("pk")
+        if options["seasons"]:
+            seasons = seasons.filter(pk__in=options["seasons"])
+            missing = set(options["seasons"]) - {season.pk for season in seasons}
+            if missing:
+                raise CommandError(f"Unknown seasons: {', '.join(map(str, sorted(missing)))}")
+        if options["missing"]:
+            seasons = seasons.filter(matches__completed=True, ratings__isnull=True).distinct()
+        for season in seasons:
+            with transaction.atomic():
+                players = recompute(season, parameters)
+                self.stdout.write(f"{season}: rated {players} players.")
+                if options["dry_run"]:
+                    for rating in season.ratings.select_related("player"):
+                        self.stdout.write(f"  {rating.player}: {rating.rating:.0f}")
+                    transaction.set_rollback(True)
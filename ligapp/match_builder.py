@@ -2,12 +2,17 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, Type, Union
+from typing import Container, Optional, Sequence, Type, Union
 
-from django.db import transaction
+from django.db import connections, router, transaction
 from django.utils import timezone
+from django.utils.translation import gettext as _
 
 from . import models
+from .caching import bump_season_version
+from .metrics import timed
+from .ranking import Ladder
+from .rating import bulk_update_ratings, update_ratings
 
 
 @dataclass
@@ -87,26 +92,38 @@ class MatchBuilder:
         self.completed = completed
         return self
 
+    @timed("match_builder.build")
     def build(self, create_related: bool = False) -> models.Match:
         """Build a match instance, save it and update the ranking."""
         with transaction.atomic():
             self._save_if_necessary(self.season, allowed=create_related)
             self._save_if_necessary(self.first_player, allowed=create_related)
             self._save_if_necessary(self.second_player, allowed=create_related)
-            match = self.match_type(
-                season=self.season,
-                date_played=self.date_played,
-                first_player=self.first_player,
-                second_player=self.second_player,
-                completed=self.completed,
-            )
-            if self.match_type is models.TimedMatch:
-                match.minutes_played = self.minutes_played
+            match = self.make()
             match.save()
             self._create_scores(match)
             self._update_ranking_if_necessary(match)
+            update_ratings(match)
+            self._invalidate_season_cache(match)
             return match
 
+    def make(self) -> models.Match:
+        """Make the match instance without saving it, with its result filled in if completed."""
+        match = self.match_type(
+            season=self.season,
+            date_played=self.date_played,
+            date_planned=self.date_planned,
+            first_player=self.first_player,
+            second_player=self.second_player,
+            completed=self.completed,
+        )
+        if self.match_type is models.TimedMatch:
+            match.minutes_played = self.minutes_played
+        if self.completed:
+            match.update_result(self.scores)
+        return match
+
+    @timed("match_builder.plan")
     def plan(self, create_related: bool = False) -> models.Match:
         """Build a planned match instance and save it."""
         with transaction.atomic():
@@ -124,46 +141,207 @@ class MatchBuilder:
             if self.match_type is models.TimedMatch:
                 match.minutes_played = self.minutes_played
             match.save()
+            self._invalidate_season_cache(match)
             return match
 
+    @timed("match_builder.complete")
     def complete(self, match) -> models.Match:
         """Add missing information to a planned match instance and set it to completed."""
         if self.match_type is not type(match):
             self.season = match.season
             self.date_planned = match.date_planned
             self.completed = True
-            new_match = self.build()
-            match.delete()
+            with transaction.atomic():
+                new_match = self.build()
+                match.delete()
             return new_match
+        self.season = match.season
         match.first_player = self.first_player
         match.second_player = self.second_player
         match.date_played = self.date_played or timezone.now()
         match.completed = True
+        match.update_result(self.scores)
         with transaction.atomic():
             match.save()
             self._create_scores(match)
             self._update_ranking_if_necessary(match)
+            update_ratings(match)
+            self._invalidate_season_cache(match)
         return match
 
+    def validate(self, participants: Container[int]) -> list[str]:
+        """
+        Check that the match can be recorded, given the pks of the season's participants.
+
+        Returns the problems found, without any queries.
+        """
+        errors = []
+        if self.season is None or self.season.pk is None:
+            errors.append(_("The match needs a saved season."))
+        players = [self.first_player, self.second_player]
+        if any(player is None or player.pk is None for player in players):
+            errors.append(_("The match needs two saved players."))
+        elif self.first_player == self.second_player:
+            errors.append(_("Must have two different players!"))
+        elif any(player.pk not in participants for player in players):
+            errors.append(_("Both players must be participants in the season."))
+        if not self.completed or self.date_played is None:
+            errors.append(_("The match must be completed, with the date when it was played."))
+        if not self.scores:
+            errors.append(_("A completed match must have at least one set."))
+        if any(score.first_score == score.second_score for score in self.scores):
+            errors.append(_("Scores in set must be different."))
+        if self.match_type is models.TimedMatch and self.minutes_played is None:
+            errors.append(_("A match played for time needs the minutes played."))
+        return errors
+
     def _create_scores(self, match):
         """Create score sets for a given match."""
-        for index, score_set in enumerate(self.scores):
-            score_set.match = match
-            score_set.order = index + 1
-            score_set.save()
+        models.Set.objects.bulk_create(_numbered_sets(self.scores, match))
+
+    def _invalidate_season_cache(self, match):
+        """Make the season pages show the new match."""
+        if match.season_id:
+            bump_season_version(match.season_id)
 
     def _save_if_necessary(self, instance, allowed: bool = False):
         """Save a related model instance if necessary and allowed."""
-        if instance and not instance.__class__.objects.contains(instance) and allowed:
+        if allowed and instance is not None and instance._state.adding:
             instance.save()
 
     def _update_ranking_if_necessary(self, match):
-        """Check and update the ranking if necessary."""
-        match.refresh_from_db()
-        ranks = [
-            self.first_player.ranks.get(season=self.season).rank,
-            self.second_player.ranks.get(season=self.season).rank,
-        ]
-        lower_ranked_player = self.first_player if ranks[0] > ranks[1] else self.second_player
-        if match.winner == lower_ranked_player:
-            self.season.update_rank(lower_ranked_player, min(ranks))
+        """
+        Check and update the ranking if necessary.
+
+        The winner is known from the scores, so only the two ranks are read, locked against
+        concurrent results in the season.
+        """
+        players = [self.first_player, self.second_player]
+        ranks = {
+            rank.player_id: rank
+            for rank in self.season.ranks.select_for_update().filter(
+                player_id__in=[player.pk for player in players]
+            )
+        }
+        if len(ranks) < 2:
+            raise models.Rank.DoesNotExist("Both players need a rank in the season.")
+        first_rank, second_rank = (ranks[player.pk].rank for player in players)
+        lower_ranked_player = self.first_player if first_rank > second_rank else self.second_player
+        if match.winner_id == lower_ranked_player.pk:
+            self.season.update_rank(
+                lower_ranked_player,
+                min(first_rank, second_rank),
+                current_rank=ranks[lower_ranked_player.pk],
+            )
+
+
+def bulk_build(builders: Sequence[MatchBuilder]) -> list[models.Match]:
+    """
+    Save the matches of many builders with a handful of queries.
+
+    Like ``MatchBuilder.build`` but the related instances must already be saved and the
+    ranking and ratings are left to the caller, who can update them once for the whole batch.
+    """
+    matches = [builder.make() for builder in builders]
+    with transaction.atomic():
+        # bulk_create does not support multi-table inheritance: insert the shared part of
+        # the rows through the base model first and the per-type part with the new pks.
+        models.Match.objects.bulk_create(matches)
+        for match_type in (models.MultiSetMatch, models.TimedMatch):
+            children = [match for match in matches if type(match) is match_type]
+            for match in children:
+                match.match_ptr_id = match.id
+            _insert_local_rows(match_type, children)
+        models.Set.objects.bulk_create(
+            score_set
+            for builder, match in zip(builders, matches, strict=True)
+            for score_set in _numbered_sets(builder.scores, match)
+        )
+        for season_pk in {match.season_id for match in matches if match.season_id}:
+            bump_season_version(season_pk)
+    return matches
+
+
+class InvalidBatchError(Exception):
+    """Error for a batch with invalid matches, carrying their positions and errors."""
+
+    def __init__(self, errors: dict[int, list[str]]):
+        """Keep the errors for reporting."""
+        super().__init__(f"{len(errors)} invalid matches")
+        self.errors = errors
+
+
+@timed("match_builder.build_round")
+def build_round(builders: Sequence[MatchBuilder]) -> list[models.Match]:
+    """
+    Record many completed matches at once, for example a whole tournament round.
+
+    All builders are validated before anything is saved, raising ``InvalidBatchError`` with
+    the problems of every invalid one. The ranks of the seasons are locked, the matches are
+    saved with ``bulk_build`` and their results applied to the ranking in the order they
+    were played, the same as recording them one by one in that order. The same goes for
+    the ratings, which are read and written once for the whole round.
+    Returns the matches in the order they were played.
+    """
+    season_pks = {builder.season.pk for builder in builders if builder.season}
+    participants: dict[int, set[int]] = {pk: set() for pk in season_pks}
+    for season_pk, player_pk in models.Season.participants.through.objects.filter(
+        season_id__in=season_pks
+    ).values_list("season_id", "player_id"):
+        participants[season_pk].add(player_pk)
+    errors = {}
+    for index, builder in enumerate(builders):
+        problems = builder.validate(participants.get(builder.season and builder.season.pk, ()))
+        if problems:
+            errors[index] = problems
+    if errors:
+        raise InvalidBatchError(errors)
+
+    in_order = sorted(builders, key=lambda builder: builder.date_played)
+    ladders: dict[int, Ladder] = {}
+    with transaction.atomic():
+        # Lock the ranks against concurrent results before reading them into the ladders.
+        list(
+            models.Rank.objects.select_for_update()
+            .filter(season_id__in=season_pks)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        matches = bulk_build(in_order)
+        for match in matches:
+            if match.season_id not in ladders:
+                ladders[match.season_id] = Ladder.load(match.season)
+            ladders[match.season_id].apply_result(
+                match.first_player_id, match.second_player_id, match.winner_id
+            )
+        for ladder in ladders.values():
+            ladder.save()
+        bulk_update_ratings(matches)
+    return matches
+
+
+def _numbered_sets(scores: list[models.Set], match: models.Match) -> list[models.Set]:
+    for index, score_set in enumerate(scores):
+        score_set.match = match
+        score_set.order = index + 1
+    return scores
+
+
+def _insert_local_rows(match_type: type[models.Match], matches: list[models.Match]) -> None:
+    """Insert only the rows of the child table, with one ``executemany``."""
+    if not matches:
+        return
+    fields = match_type._meta.local_concrete_fields
+    connection = connections[router.db_for_write(match_type)]
+    quote_name = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(  # noqa: S608 ## quoted model names only
+        quote_name(match_type._meta.db_table),
+        ", ".join(quote_name(field.column) for field in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    rows = [
+        [field.get_db_prep_save(field.pre_save(match, True), connection) for field in fields]
+        for match in matches
+    ]
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, rows)
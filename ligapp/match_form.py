@@ -1,7 +1,7 @@
 """Forms for the ligapp."""
 
 from datetime import date, datetime
-from typing import Any, Optional
+from typing import Any, Container, Optional
 
 import babel.dates
 from crispy_bootstrap5.bootstrap5 import FloatingField
@@ -129,7 +129,97 @@ class ConditionalNumberInput(ConditionalMixin, forms.NumberInput):
     ...
 
 
-class NewMatchForm(forms.Form):
+class MatchRulesMixin:
+    """
+    Validation rules for a recorded match.
+
+    Shared between the forms and the match importer, which provide ``add_error``.
+    """
+
+    def validate_match(self, cleaned_data: dict[str, Any]) -> None:
+        """Apply all the rules to the cleaned field values."""
+        self.validate_players_different(cleaned_data)
+        self.validate_players_in_season(cleaned_data)
+        self.validate_minutes_played(cleaned_data)
+        self.validate_scores(cleaned_data)
+
+    def get_participants(self, season: Season) -> Container[Player]:
+        """Get the players allowed to play in ``season``."""
+        return season.participants.all()
+
+    def validate_players_different(self, cleaned_data: dict[str, Any]) -> None:
+        if "first_player" and "second_player" in cleaned_data:
+            first = cleaned_data["first_player"]
+            second = cleaned_data["second_player"]
+            if first == second:
+                self.add_error(
+                    "second_player",
+                    ValidationError(_("Can not be the same as the first player."), code="invalid"),
+                )
+
+    def validate_players_in_season(self, cleaned_data: dict[str, Any]) -> None:
+        season = cleaned_data.get("season")
+        if not season:
+            return None
+        for player_field in ["first_player", "second_player"]:
+            player = cleaned_data.get(player_field)
+            if player and player not in self.get_participants(season):
+                self.add_error(
+                    player_field,
+                    ValidationError(_("Is not a participant in this season."), code="invalid"),
+                )
+
+    def validate_minutes_played(self, cleaned_data: dict[str, Any]) -> None:
+        if cleaned_data.get("match_type") == Match.MatchType.TIME:
+            if cleaned_data.get("minutes_played") is None:
+                self.add_error(
+                    "minutes_played",
+                    ValidationError(_("Required for a match played for time."), code="required"),
+                )
+
+    def validate_scores(self, cleaned_data: dict[str, Any]) -> None:
+        scores = [
+            (
+                cleaned_data.get(f"first_score_{i}"),
+                cleaned_data.get(f"second_score_{i}"),
+            )
+            for i in range(1, 4)
+        ]
+        match_type = cleaned_data.get("match_type")
+        if match_type == Match.MatchType.SETS:
+            for i, score_set in enumerate(scores):
+                self._validate_set_complete(score_set, i + 1)
+                self._validate_set_is_regulation(score_set, i + 1)
+
+    def _validate_set_complete(
+        self, score_set: tuple[Optional[int], Optional[int]], set_nr: int
+    ) -> None:
+        scores_added = [i is not None for i in score_set]
+        if any(scores_added) and not all(scores_added):
+            message = _("Incomplete set.")
+            if not scores_added[0]:
+                self.add_error(f"first_score_{set_nr}", ValidationError(message, code="required"))
+            if not scores_added[1]:
+                self.add_error(f"second_score_{set_nr}", ValidationError(message, code="required"))
+
+    def _validate_set_is_regulation(
+        self, score_set: tuple[Optional[int], Optional[int]], set_nr: int
+    ) -> None:
+        """
+        Validate scoring rules.
+
+        Currently, regulation only means there are no draws.
+        More rigorous rules should be added in a customizable way on the season record.
+        """
+        scores_added = [i is not None for i in score_set]
+        if any(scores_added):
+            if score_set[0] == score_set[1]:
+                message = _("Scores in set must be different.")
+                self.add_error(f"first_score_{set_nr}", ValidationError(message, code="invalid"))
+                self.add_error(f"second_score_{set_nr}", ValidationError(message, code="invalid"))
+
+
+class NewMatchForm(MatchRulesMixin, forms.Form):
     """Form for recording a match."""
 
     season = forms.ModelChoiceField(
@@ -215,74 +305,9 @@ class NewMatchForm(forms.Form):
 
     def clean(self) -> dict[str, Any]:
         cleaned_data = super().clean()
-        self.validate_players_different(cleaned_data)
-        self.validate_players_in_season(cleaned_data)
-        self.validate_scores(cleaned_data)
+        self.validate_match(cleaned_data)
         return cleaned_data
 
-    def validate_players_different(self, cleaned_data: dict[str, Any]) -> None:
-        if "first_player" and "second_player" in cleaned_data:
-            first = cleaned_data["first_player"]
-            second = cleaned_data["second_player"]
-            if first == second:
-                self.add_error(
-                    "second_player",
-                    ValidationError(_("Can not be the same as the first player."), code="invalid"),
-                )
-
-    def validate_players_in_season(self, cleaned_data: dict[str, Any]) -> None:
-        season = cleaned_data.get("season")
-        if not season:
-            return None
-        for player_field in ["first_player", "second_player"]:
-            player = cleaned_data.get(player_field)
-            if player and player not in season.participants.all():
-                self.add_error(
-                    player_field,
-                    ValidationError(_("Is not a participant in this season."), code="invalid"),
-                )
-
-    def validate_scores(self, cleaned_data: dict[str, Any]) -> None:
-        scores = [
-            (
-                cleaned_data.get(f"first_score_{i}"),
-                cleaned_data.get(f"second_score_{i}"),
-            )
-            for i in range(1, 4)
-        ]
-        match_type = cleaned_data.get("match_type")
-        if match_type == Match.MatchType.SETS:
-            for i, score_set in enumerate(scores):
-                self._validate_set_complete(score_set, i + 1)
-                self._validate_set_is_regulation(score_set, i + 1)
-
-    def _validate_set_complete(
-        self, score_set: tuple[Optional[int], Optional[int]], set_nr: int
-    ) -> None:
-        scores_added = [i is not None for i in score_set]
-        message = _("Incomplete set.")
-        if any(scores_added):
-            if not scores_added[0]:
-                self.add_error(f"first_score_{set_nr}", ValidationError(message, code="required"))
-            if not scores_added[1]:
-                self.add_error(f"second_score_{set_nr}", ValidationError(message, code="required"))
-
-    def _validate_set_is_regulation(
-        self, score_set: tuple[Optional[int], Optional[int]], set_nr: int
-    ) -> None:
-        """
-        Validate scoring rules.
-
-        Currently, regulation only means there are no draws.
-        More rigorous rules should be added in a customizable way on the season record.
-        """
-        scores_added = [i is not None for i in score_set]
-        message = _("Scores in set must be different.")
-        if any(scores_added):
-            if score_set[0] == score_set[1]:
-                self.add_error(f"first_score_{set_nr}", ValidationError(message, code="invalid"))
-                self.add_error(f"second_score_{set_nr}", ValidationError(message, code="invalid"))
-
 
 class NewPlayerMatchForm(NewMatchForm):
     """Same as NewMatchForm, except the first player is fixed."""
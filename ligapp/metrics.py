@@ -0,0 +1,244 @@
+"""
+Prometheus metrics of the views, the database, the cache and the write paths.
+
+Under gunicorn the metrics of all workers are kept in ``PROMETHEUS_MULTIPROC_DIR`` (set up
+in ``gunicorn.conf.py``) and summed up when ``/metrics`` is scraped, so it does not matter
+which worker answers. Without that directory only the current process is reported.
+"""
+
+import contextlib
+import functools
+import hmac
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, HttpResponseBase, HttpResponseForbidden
+from django.dispatch import receiver
+from django.views.decorators.http import require_safe
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+REQUEST_DURATION = Histogram(
+    "ligapp_request_duration_seconds",
+    "Time to answer a request, by url name.",
+    ["view", "method"],
+)
+REQUESTS = Counter(
+    "ligapp_requests_total", "Answered requests, by url name and status.", ["view", "status"]
+)
+REQUEST_QUERIES = Histogram(
+    "ligapp_request_db_queries",
+    "Database queries per request, by url name.",
+    ["view"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_DB_DURATION = Histogram(
+    "ligapp_request_db_duration_seconds",
+    "Time spent in database queries per request, by url name.",
+    ["view"],
+)
+CACHE_LOOKUPS = Counter(
+    "ligapp_cache_lookups_total", "Cache lookups by key, by cache and result.", ["cache", "result"]
+)
+WRITE_DURATION = Histogram(
+    "ligapp_write_duration_seconds", "Time of the write operations.", ["operation"]
+)
+WRITE_ERRORS = Counter(
+    "ligapp_write_errors_total", "Write operations that raised an error.", ["operation"]
+)
+
+
+def timed(operation: str) -> Callable:
+    """Count and time calls of a write operation, and count its errors."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with WRITE_DURATION.labels(operation).time():
+                try:
+                    return func(*args, **kwargs)
+                except Exception:
+                    WRITE_ERRORS.labels(operation).inc()
+                    raise
+
+        return wrapper
+
+    return decorator
+
+
+class QueryStats:
+    """
+    Count and time the queries on all database connections, with ``execute_wrapper``.
+
+    Every connection gets a wrapper when it is opened, which reports to the ``QueryStats``
+    capturing in the current context. The context is copied to the thread running the sync
+    code of an async request, so its queries are counted too.
+    """
+
+    def __init__(self):
+        """Start at zero."""
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+    @contextlib.contextmanager
+    def capture(self) -> Iterator["QueryStats"]:
+        token = _capturing.set(self)
+        try:
+            yield self
+        finally:
+            _capturing.reset(token)
+
+
+_capturing: ContextVar[Optional[QueryStats]] = ContextVar("ligapp_query_stats", default=None)
+
+
+def _report_query(execute, sql, params, many, context):
+    stats = _capturing.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def report_queries(sender, connection, **kwargs):
+    """Report the queries of a new connection to the capturing ``QueryStats``, if any."""
+    if _report_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_report_query)
+
+
+class MetricsMiddleware:
+    """
+    Record the latency, status and database use of every request, should come first.
+
+    Streaming responses like the live season feed are only counted, their duration is how
+    long the client stayed connected.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        """Wrap the rest of the middleware chain."""
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        with QueryStats().capture() as queries:
+            response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        with QueryStats().capture() as queries:
+            response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - start, queries)
+        return response
+
+    def _record(
+        self,
+        request: HttpRequest,
+        response: HttpResponseBase,
+        duration: float,
+        queries: QueryStats,
+    ) -> None:
+        match = request.resolver_match
+        view = match.view_name if match else "unresolved"
+        REQUESTS.labels(view, str(response.status_code)).inc()
+        if response.streaming:
+            return
+        REQUEST_DURATION.labels(view, request.method).observe(duration)
+        REQUEST_QUERIES.labels(view).observe(queries.count)
+        REQUEST_DB_DURATION.labels(view).observe(queries.duration)
+
+
+class CacheMetricsMixin:
+    """
+    Count the hits and misses of a cache backend, labelled with the backend class.
+
+    Only ``get`` is counted, the ``get_many`` of the file based and local memory caches
+    goes through it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Set up the backend and its counters."""
+        super().__init__(*args, **kwargs)
+        self._hits = CACHE_LOOKUPS.labels(self.metrics_name, "hit")
+        self._misses = CACHE_LOOKUPS.labels(self.metrics_name, "miss")
+
+    @property
+    def metrics_name(self) -> str:
+        return type(self).__name__
+
+    def get(self, key: str, default: Any = None, version: Any = None) -> Any:
+        sentinel = object()
+        value = super().get(key, sentinel, version=version)
+        if value is sentinel:
+            self._misses.inc()
+            return default
+        self._hits.inc()
+        return value
+
+
+class FileBasedCacheWithMetrics(CacheMetricsMixin, FileBasedCache):
+    """``FileBasedCache`` counting hits and misses."""
+
+
+class LocMemCacheWithMetrics(CacheMetricsMixin, LocMemCache):
+    """``LocMemCache`` counting hits and misses."""
+
+
+def registry() -> CollectorRegistry:
+    """The registry to expose: all workers' metrics in multiprocess mode, else this process'."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return collected
+
+
+def _authorized(request: HttpRequest) -> bool:
+    token = getattr(settings, "LIGAPP_METRICS_TOKEN", None)
+    if token:
+        sent = request.headers.get("Authorization", "")
+        return hmac.compare_digest(sent.encode(), f"Bearer {token}".encode())
+    return request.user.is_staff
+
+
+@require_safe
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """
+    Expose the metrics in the Prometheus text format.
+
+    Scrapers authenticate with ``Authorization: Bearer <LIGAPP_METRICS_TOKEN>``. Without a
+    token configured, only staff users can see the metrics.
+    """
+    if not _authorized(request):
+        return HttpResponseForbidden()
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:09
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def histories_to_events(apps, schema_editor):
+    """Turn every entry of the JSON ranking histories into a rank event row."""
+    RankingHistory = apps.get_model("ligapp", "RankingHistory")
+    RankEvent = apps.get_model("ligapp", "RankEvent")
+    events = []
+    for history in RankingHistory.objects.iterator():
+        for entry in history.history:
+            events.append(
+                RankEvent(
+                    season_id=history.season_id,
+                    player_id=history.player_id,
+                    timestamp=parse_datetime(entry["timestamp"]),
+                    rank=entry["rank"],
+                )
+            )
+        if len(events) >= 1000:
+            RankEvent.objects.bulk_create(events)
+            events = []
+    RankEvent.objects.bulk_create(events)
+
+
+def events_to_histories(apps, schema_editor):
+    """Collect the rank events per season and player back into JSON ranking histories."""
+    RankingHistory = apps.get_model("ligapp", "RankingHistory")
+    RankEvent = apps.get_model("ligapp", "RankEvent")
+    histories = {}
+    for event in RankEvent.objects.order_by("timestamp", "id").iterator():
+        histories.setdefault((event.season_id, event.player_id), []).append(
+            {"timestamp": str(event.timestamp), "rank": event.rank}
+        )
+    RankingHistory.objects.bulk_create(
+        RankingHistory(season_id=season_id, player_id=player_id, history=history)
+        for (season_id, player_id), history in histories.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ligapp", "0013_alter_match_options_alter_multisetmatch_options_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RankEvent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("timestamp", models.DateTimeField(default=django.utils.timezone.now)),
+                ("rank", models.PositiveSmallIntegerField()),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.RESTRICT,
+                        related_name="rank_events",
+                        to="ligapp.player",
+                    ),
+                ),
+                (
+                    "season",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rank_events",
+                        to="ligapp.season",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "rank event",
+                "verbose_name_plural": "rank events",
+                "ordering": ["timestamp", "id"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="rankevent",
+            index=models.Index(
+                fields=["season", "player", "timestamp"], name="ligapp_rank_season__251023_idx"
+            ),
+        ),
+        migrations.RunPython(histories_to_events, events_to_histories),
+        migrations.DeleteModel(
+            name="RankingHistory",
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ligapp", "0014_rankevent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="match",
+            name="first_points",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="match",
+            name="first_sets_won",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="match",
+            name="second_points",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="match",
+            name="second_sets_won",
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="match",
+            name="winner",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="matches_won",
+                to="ligapp.player",
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ligapp", "0015_match_result"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Rating",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                ("rating", models.FloatField()),
+                ("matches_played", models.PositiveIntegerField(default=0)),
+                (
+                    "player",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.RESTRICT,
+                        related_name="ratings",
+                        to="ligapp.player",
+                    ),
+                ),
+                (
+                    "season",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ratings",
+                        to="ligapp.season",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "player rating",
+                "verbose_name_plural": "player ratings",
+                "ordering": ["season", "-rating"],
+                "unique_together": {("season", "player")},
+            },
+        ),
+    ]
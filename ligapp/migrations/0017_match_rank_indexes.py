@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("ligapp", "0016_rating"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                condition=models.Q(("completed", True)),
+                fields=["season", "date_played"],
+                name="match_season_played_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                condition=models.Q(("completed", False)),
+                fields=["season", "date_planned"],
+                name="match_season_planned_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="match",
+            index=models.Index(
+                condition=models.Q(("completed", True)),
+                fields=["first_player", "second_player"],
+                name="match_players_played_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="rank",
+            index=models.Index(fields=["season", "rank"], name="rank_season_rank_idx"),
+        ),
+    ]
@@ -1,7 +1,8 @@
 """Ligapp models."""
 
+import asyncio
 import datetime
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
@@ -9,8 +10,12 @@ from django.core.validators import MaxValueValidator
 from django.db import models, transaction
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 
+from .caching import bump_season_version
+from .metrics import timed
+
 
 class Player(models.Model):
     """A participant in the league."""
@@ -30,6 +35,30 @@ class Player(models.Model):
         return self.name
 
 
+class SeasonQuerySet(models.QuerySet):
+    """Custom queries for seasons."""
+
+    def for_user(self, user: User) -> "SeasonQuerySet":
+        """
+        Only the seasons the user administers or plays in (all of them for staff).
+
+        Annotated with whether the user is an admin or participant of each season.
+        """
+        seasons = self.annotate(
+            is_admin=models.Exists(
+                Season.admins.through.objects.filter(season=models.OuterRef("pk"), user=user.pk)
+            ),
+            is_participant=models.Exists(
+                Season.participants.through.objects.filter(
+                    season=models.OuterRef("pk"), player__user=user.pk
+                )
+            ),
+        )
+        if not user.is_staff:
+            seasons = seasons.filter(models.Q(is_admin=True) | models.Q(is_participant=True))
+        return seasons
+
+
 class Season(models.Model):
     """A league season."""
 
@@ -39,6 +68,8 @@ class Season(models.Model):
     participants = models.ManyToManyField(Player, blank=True)
     admins = models.ManyToManyField(User, related_name="season_admin_for", blank=True)
 
+    objects = SeasonQuerySet.as_manager()
+
     class Meta:
         """Options for the Season model."""
 
@@ -58,6 +89,7 @@ class Season(models.Model):
         with transaction.atomic():
             self.participants.add(player)
             self.ranks.create(season=self, player=player, rank=self.next_free_rank)
+            bump_season_version(self.pk)
 
     def create_player(self, **kwargs) -> Player:
         """Create a new player, adding them to the season."""
@@ -65,30 +97,52 @@ class Season(models.Model):
         with transaction.atomic():
             player = self.participants.create(**kwargs)
             self.ranks.create(season=self, player=player, rank=self.next_free_rank)
+            bump_season_version(self.pk)
 
         return player
 
-    def update_rank(self, player: Player, new_position: int):
-        """Update a player's rank and everything that follows."""
-        current_rank, _ = self.ranks.get_or_create(
-            player=player, defaults={"season": self, "rank": self.next_free_rank}
-        )
+    @timed("season.update_rank")
+    def update_rank(self, player: Player, new_position: int, current_rank: Optional["Rank"] = None):
+        """
+        Update a player's rank and everything that follows.
+
+        Pass the player's ``current_rank`` if it is already loaded, to save looking it up.
+        """
+        if current_rank is None:
+            current_rank, _ = self.ranks.get_or_create(
+                player=player, defaults={"season": self, "rank": lambda: self.next_free_rank}
+            )
         old_position = current_rank.rank
         if old_position == new_position:
             return None
         step = 1 if old_position < new_position else -1
-        affected_ranks = self.ranks.filter(
-            rank__in=range(old_position + step, new_position + step, step)
-        )
+        window = sorted((old_position + step, new_position))
         with transaction.atomic():
-            for rank in affected_ranks:
-                rank.update(rank.rank - step)
-            current_rank.update(new_position)
+            affected_ranks = self.ranks.filter(rank__range=window).exclude(pk=current_rank.pk)
+            new_ranks = {
+                player_id: rank - step
+                for player_id, rank in affected_ranks.values_list("player_id", "rank")
+            }
+            affected_ranks.update(rank=models.F("rank") - step)
+            self.ranks.filter(pk=current_rank.pk).update(rank=new_position)
+            current_rank.rank = new_position
+            new_ranks[player.pk] = new_position
+            self._record_rank_events(new_ranks)
+            bump_season_version(self.pk)
+
+    def _record_rank_events(self, new_ranks: dict[int, int]):
+        """Append a rank event per player, given a mapping of player pks to new ranks."""
+        timestamp = timezone.now()
+        RankEvent.objects.bulk_create(
+            RankEvent(season=self, player_id=player_id, timestamp=timestamp, rank=rank)
+            for player_id, rank in new_ranks.items()
+        )
 
     @property
     def next_free_rank(self) -> int:
         """Calculate what rank the next added player would start at."""
-        return self.ranks.last().rank + 1 if self.ranks.last() else 1
+        last_rank = self.ranks.last()
+        return last_rank.rank + 1 if last_rank else 1
 
     @property
     def end_date_str(self) -> str:
@@ -98,41 +152,76 @@ class Season(models.Model):
     def matches_by_date(
         self, queryset=None, n_matches: Optional[int] = None
     ) -> list[tuple[datetime.date, list["Match"]]]:
+        """Group the (latest ``n_matches``) matches by date, preloaded for display."""
         if queryset is None:
-            queryset = self.matches
-        if not queryset:
-            return []
-        last_n_matches = queryset.order_by("-date_played")[:n_matches]
-
-        def add_match(matches_by_date, match):
-            display_date = match.date_played or match.date_planned or timezone.now()
-            matches_by_date.setdefault(display_date.date(), []).append(match)
+            queryset = self.matches.all()
+        last_n_matches = queryset.with_details().order_by("-date_played")[:n_matches]
+        return group_matches_by_date(last_n_matches)
 
-        def group_matches(matches):
-            result = {}
-            for match in matches:
-                add_match(result, match)
-            return result
-
-        return group_matches(last_n_matches).items()
-
-    @property
+    @cached_property
     def latest_matches(self) -> list[tuple[datetime.date, list["Match"]]]:
         return self.matches_by_date(self.matches.filter(completed=True), 10)
 
     @property
-    def match_history(self) -> list[tuple[datetime.date, list["Match"]]]:
-        return self.matches_by_date(self.matches.filter(completed=True))
+    def ranking(self) -> models.QuerySet["Rank"]:
+        ratings = Rating.objects.filter(
+            season=models.OuterRef("season"), player=models.OuterRef("player")
+        )
+        return self.ranks.select_related("player").annotate(
+            rating=models.Subquery(ratings.values("rating")[:1])
+        )
 
-    @property
-    def top_16(self) -> list[tuple[datetime.date, list["Match"]]]:
-        return self.ranks.all()[:16]
+    @cached_property
+    def top_16(self) -> models.QuerySet["Rank"]:
+        return self.ranking[:16]
 
-    @property
+    @cached_property
     def planned_matches(self) -> list[tuple[datetime.date, list["Match"]]]:
         planned_matches = self.matches.filter(completed=False)
         return self.matches_by_date(queryset=planned_matches)
 
+    async def amatches_by_date(
+        self, queryset=None, n_matches: Optional[int] = None
+    ) -> list[tuple[datetime.date, list["Match"]]]:
+        """Async version of ``matches_by_date``."""
+        if queryset is None:
+            queryset = self.matches.all()
+        last_n_matches = queryset.with_details().order_by("-date_played")[:n_matches]
+        return group_matches_by_date([match async for match in last_n_matches])
+
+    async def apreload(self, *names: str) -> None:
+        """
+        Load the ``latest_matches``, ``top_16`` and/or ``planned_matches`` with async queries.
+
+        The queries run concurrently and their results fill in the properties.
+        """
+        loaders = {
+            "latest_matches": lambda: self.amatches_by_date(
+                self.matches.filter(completed=True), 10
+            ),
+            "top_16": lambda: alist(self.ranking[:16]),
+            "planned_matches": lambda: self.amatches_by_date(self.matches.filter(completed=False)),
+        }
+        results = await asyncio.gather(*(loaders[name]() for name in names))
+        for name, result in zip(names, results, strict=True):
+            setattr(self, name, result)
+
+
+async def alist(queryset: models.QuerySet) -> list:
+    """Evaluate a queryset (including its prefetches) with the async ORM."""
+    return [instance async for instance in queryset]
+
+
+def group_matches_by_date(
+    matches: Iterable["Match"],
+) -> list[tuple[datetime.date, list["Match"]]]:
+    """Group matches by the date they were played or planned on, keeping their order."""
+    result: dict[datetime.date, list["Match"]] = {}
+    for match in matches:
+        display_date = match.date_played or match.date_planned or timezone.now()
+        result.setdefault(display_date.date(), []).append(match)
+    return list(result.items())
+
 
 class Rank(models.Model):
     """A rank of a player in a season."""
@@ -148,25 +237,19 @@ class Rank(models.Model):
         verbose_name_plural = "player ranks"
         unique_together = [["season", "player"]]
         ordering = ["season", "rank"]
+        indexes = [models.Index(fields=["season", "rank"], name="rank_season_rank_idx")]
 
     def __str__(self) -> str:
         """Stringify rank object."""
         return f"{self.season.name} | {self.rank}. {self.player.name}"
 
     def save(self, *args, **kwargs):
-        """Update the ranking history when saving."""
+        """Record a rank event when saving."""
         with transaction.atomic():
-            history, created = self.season.histories.get_or_create(
-                player=self.player,
-                defaults={
-                    "season": self.season,
-                    "history": ranking_history_entry(self.rank),
-                },
+            super().save(*args, **kwargs)
+            RankEvent.objects.create(
+                season_id=self.season_id, player_id=self.player_id, rank=self.rank
             )
-            if not created:
-                history.history.extend(ranking_history_entry(self.rank))
-                history.save()
-            return super().save(*args, **kwargs)
 
     def update(self, new_position):
         """Update the ranking position."""
@@ -175,26 +258,60 @@ class Rank(models.Model):
 
 
 def ranking_history_entry(rank: int = -1):
-    """Build a ranking history entry."""
+    """Build a ranking history entry (kept for the historical migrations)."""
     return [{"timestamp": str(timezone.now()), "rank": rank}]
 
 
-class RankingHistory(models.Model):
-    """History of a player's rank in a season."""
+class RankEvent(models.Model):
+    """A change of a player's rank in a season."""
+
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="rank_events")
+    player = models.ForeignKey(Player, on_delete=models.RESTRICT, related_name="rank_events")
+    timestamp = models.DateTimeField(default=timezone.now)
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        """RankEvent settings."""
+
+        verbose_name = "rank event"
+        verbose_name_plural = "rank events"
+        ordering = ["timestamp", "id"]
+        indexes = [models.Index(fields=["season", "player", "timestamp"])]
+
+    def __str__(self) -> str:
+        """Stringify rank event object."""
+        return f"{self.season.name} | {self.timestamp} | {self.rank}. {self.player.name}"
+
+
+class Rating(models.Model):
+    """An Elo skill rating of a player in a season, see ``ligapp.rating``."""
 
-    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="histories")
-    player = models.ForeignKey(Player, on_delete=models.RESTRICT, related_name="histories")
-    history = models.JSONField(default=ranking_history_entry)
+    season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name="ratings")
+    player = models.ForeignKey(Player, on_delete=models.RESTRICT, related_name="ratings")
+    rating = models.FloatField()
+    matches_played = models.PositiveIntegerField(default=0)
 
     class Meta:
-        """RankingHistory settings."""
+        """Rating settings."""
 
-        verbose_name = "ranking history"
-        verbose_name_plural = "ranking histories"
+        verbose_name = "player rating"
+        verbose_name_plural = "player ratings"
+        unique_together = [["season", "player"]]
+        ordering = ["season", "-rating"]
 
     def __str__(self) -> str:
-        """Stringify ranking history object."""
-        return f"Ranking History | {self.season.name} | {self.player.name}"
+        """Stringify rating object."""
+        return f"{self.season.name} | {self.player.name}: {self.rating:.0f}"
+
+
+class MatchQuerySet(models.QuerySet):
+    """Custom queries for matches."""
+
+    def with_details(self) -> "MatchQuerySet":
+        """Preload players, the derived match record and the sets for displaying matches."""
+        return self.select_related(
+            "first_player", "second_player", "multisetmatch", "timedmatch"
+        ).prefetch_related("sets")
 
 
 class Match(models.Model):
@@ -214,6 +331,19 @@ class Match(models.Model):
         null=True,
         blank=True,
     )
+    winner = models.ForeignKey(
+        Player,
+        on_delete=models.PROTECT,
+        related_name="matches_won",
+        null=True,
+        blank=True,
+    )
+    first_sets_won = models.PositiveSmallIntegerField(null=True, blank=True)
+    second_sets_won = models.PositiveSmallIntegerField(null=True, blank=True)
+    first_points = models.PositiveIntegerField(null=True, blank=True)
+    second_points = models.PositiveIntegerField(null=True, blank=True)
+
+    objects = MatchQuerySet.as_manager()
 
     class Meta:
         """Options for the match model."""
@@ -221,6 +351,23 @@ class Match(models.Model):
         verbose_name = "match"
         verbose_name_plural = "matches"
         ordering = ["date_played"]
+        indexes = [
+            models.Index(
+                fields=["season", "date_played"],
+                condition=models.Q(completed=True),
+                name="match_season_played_idx",
+            ),
+            models.Index(
+                fields=["season", "date_planned"],
+                condition=models.Q(completed=False),
+                name="match_season_planned_idx",
+            ),
+            models.Index(
+                fields=["first_player", "second_player"],
+                condition=models.Q(completed=True),
+                name="match_players_played_idx",
+            ),
+        ]
 
     class MatchType(models.TextChoices):
         """Enum for match type choices."""
@@ -286,6 +433,35 @@ class Match(models.Model):
         """Represent duration of the match (empty except for ``TimedMatch``)."""
         return ""
 
+    RESULT_FIELDS = [
+        "winner",
+        "first_sets_won",
+        "second_sets_won",
+        "first_points",
+        "second_points",
+    ]
+
+    def update_result(self, sets: Optional[Iterable["Set"]] = None) -> None:
+        """
+        Fill in the stored result fields from the scores (without saving).
+
+        Uses the given (possibly unsaved) sets or else the saved sets of the match.
+        """
+        sets = list(self.sets.all() if sets is None else sets)
+        self.first_sets_won = sum(s.first_score > s.second_score for s in sets)
+        self.second_sets_won = sum(s.first_score < s.second_score for s in sets)
+        self.first_points = sum(s.first_score for s in sets)
+        self.second_points = sum(s.second_score for s in sets)
+        self.winner_id = self._winner_pk_from_sets(sets)
+
+    def _winner_pk_from_sets(self, sets: list["Set"]) -> Optional[int]:
+        """Find the player who won more sets or None in case of a draw."""
+        if self.first_sets_won > self.second_sets_won:
+            return self.first_player_id
+        elif self.first_sets_won < self.second_sets_won:
+            return self.second_player_id
+        return None
+
     @property
     def child(self) -> Any:
         """Handle to the derived database record if accessed through ``Match``."""
@@ -316,13 +492,13 @@ class TimedMatch(Match):
         """Represent the match duration."""
         return f" ({self.minutes_played} minutes)"
 
-    @property
-    def winner(self) -> Optional[Player]:
+    def _winner_pk_from_sets(self, sets: list["Set"]) -> Optional[int]:
         """Find the player who won more points or None in case of a draw."""
-        score = self.sets.first()
-        if score:
-            return score.winner
-        return None
+        if not sets or sets[0].first_score == sets[0].second_score:
+            return None
+        if sets[0].first_score > sets[0].second_score:
+            return self.first_player_id
+        return self.second_player_id
 
 
 class MultiSetMatch(Match):
@@ -334,18 +510,6 @@ class MultiSetMatch(Match):
         verbose_name = "match for points"
         verbose_name_plural = "matches for points"
 
-    @property
-    def winner(self) -> Optional[Player]:
-        """Find the player who won more sets or None in case of a draw."""
-        set_winners = [s.winner for s in self.sets.all()]
-        first_sets_won = set_winners.count(self.first_player)
-        second_sets_won = set_winners.count(self.second_player)
-        if first_sets_won > second_sets_won:
-            return self.first_player
-        elif first_sets_won < second_sets_won:
-            return self.second_player
-        return None
-
     @property
     def minutes_played_str(self) -> str:
         """Represent the match duration (always empty)."""
@@ -0,0 +1,85 @@
+"""Keyset pagination for the match history."""
+
+import dataclasses
+import datetime
+from typing import Optional
+
+from django.db.models import Q
+
+from . import models
+
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+@dataclasses.dataclass(frozen=True)
+class MatchCursor:
+    """
+    Position in the match history, ordered by ``(date_played, pk)``, newest first.
+
+    The string form is used in the page links.
+    """
+
+    date_played: datetime.datetime
+    pk: int
+
+    @classmethod
+    def after(cls, match: models.Match) -> "MatchCursor":
+        """Point to the position right after ``match``."""
+        return cls(date_played=match.date_played, pk=match.pk)
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> Optional["MatchCursor"]:
+        """Parse the string form, returning None for missing or invalid cursors."""
+        try:
+            date_str, pk_str = (value or "").split("_")
+            return cls(date_played=EPOCH + int(date_str) * MICROSECOND, pk=int(pk_str))
+        except (ValueError, OverflowError):
+            return None
+
+    def __str__(self) -> str:
+        """Encode the cursor for use in a URL."""
+        return f"{(self.date_played - EPOCH) // MICROSECOND}_{self.pk}"
+
+    def remaining(self) -> Q:
+        """Filter for the matches that come after the cursor."""
+        return Q(date_played__lt=self.date_played) | Q(date_played=self.date_played, pk__lt=self.pk)
+
+
+@dataclasses.dataclass
+class MatchHistoryPage:
+    """
+    One page of the match history, grouped by date.
+
+    Pages have a fixed number of matches, so a date can be split over two pages. Then
+    ``continued`` tells that the first date of the page was also the last one of the page
+    before.
+    """
+
+    matches_by_date: list[tuple[datetime.date, list[models.Match]]]
+    next_cursor: Optional[MatchCursor]
+    continued: bool = False
+
+
+def match_history_page(
+    season: models.Season, cursor: Optional[MatchCursor] = None, page_size: int = 50
+) -> MatchHistoryPage:
+    """
+    Get the page of completed matches after ``cursor``.
+
+    Seeks directly to the cursor position through the index of the completed matches, so
+    deep pages cost the same as the first one. Completed matches always have a date played.
+    """
+    matches = season.matches.filter(completed=True)
+    if cursor:
+        matches = matches.filter(cursor.remaining())
+    page = list(matches.with_details().order_by("-date_played", "-pk")[: page_size + 1])
+    next_cursor = MatchCursor.after(page[page_size - 1]) if len(page) > page_size else None
+    matches_by_date = models.group_matches_by_date(page[:page_size])
+    return MatchHistoryPage(
+        matches_by_date=matches_by_date,
+        next_cursor=next_cursor,
+        continued=bool(
+            cursor and matches_by_date and matches_by_date[0][0] == cursor.date_played.date()
+        ),
+    )
@@ -0,0 +1,98 @@
+"""
+Opt-in profiling of single requests with cProfile, for finding out where a slow page spends
+its time (queries, form layouts or templates).
+
+A request is profiled if a staff user sends the ``X-Profile`` header, or for a random
+sample of all requests. The stats are written as pstats files, grouped by view name, to be
+read with ``python -m pstats`` or a viewer like snakeviz.
+"""
+
+import cProfile
+import dataclasses
+import random
+import re
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest, HttpResponse
+
+
+@dataclasses.dataclass(frozen=True)
+class ProfilingSettings:
+    """
+    Where and when to profile, from the ``LIGAPP_PROFILING`` setting.
+
+    Profiling is off without a ``directory``. The files in it are deleted oldest first when
+    they take more than ``max_bytes`` together.
+    """
+
+    directory: Optional[Path] = None
+    header: str = "X-Profile"
+    sample_rate: float = 0.0
+    max_bytes: int = 100 * 1024 * 1024
+
+    @classmethod
+    def from_settings(cls) -> "ProfilingSettings":
+        options = dict(getattr(settings, "LIGAPP_PROFILING", {}))
+        if options.get("directory"):
+            options["directory"] = Path(options["directory"])
+        return cls(**options)
+
+
+class ProfilingMiddleware:
+    """Profile the rest of the request (views, forms and templates), must come after auth."""
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        """Take the settings once, the middleware is left out if profiling is off."""
+        self.get_response = get_response
+        self.settings = ProfilingSettings.from_settings()
+        if self.settings.directory is None:
+            raise MiddlewareNotUsed
+        self.header = f"HTTP_{self.settings.header.upper().replace('-', '_')}"
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        requested = self.header in request.META and request.user.is_staff
+        if not requested and random.random() >= self.settings.sample_rate:  # noqa: S311
+            return self.get_response(request)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        path = self.write(profile, request, elapsed_ms)
+        if requested:
+            response["X-Profile-File"] = str(path.relative_to(self.settings.directory))
+        return response
+
+    def write(self, profile: cProfile.Profile, request: HttpRequest, elapsed_ms: float) -> Path:
+        """Dump the stats to ``<directory>/<view name>/<time>-<duration>ms.prof``."""
+        match = request.resolver_match
+        view_name = re.sub(r"[^\w.-]", "-", match.view_name if match else "unresolved")
+        directory = self.settings.directory / view_name
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{time.time_ns()}-{elapsed_ms:.0f}ms.prof"
+        profile.dump_stats(path)
+        self.clean_up()
+        return path
+
+    def clean_up(self) -> None:
+        """Delete the oldest files until the rest fit into ``max_bytes``."""
+        files = []
+        for path in self.settings.directory.glob("*/*.prof"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:  # deleted by another worker
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.settings.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
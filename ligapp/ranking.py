@@ -0,0 +1,216 @@
+"""In-memory ranking ladder, for applying many results before saving once."""
+
+import dataclasses
+import datetime
+from array import array
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import Min
+
+from . import models
+from .caching import bump_season_version
+
+
+class Ladder:
+    """
+    A season's ranking held in memory.
+
+    Results are applied with the same rule as ``MatchBuilder``: a lower ranked winner takes
+    the rank of the loser and everyone in between moves down by one.
+
+    Players are numbered densely in the order they are added, and the ranking is kept as
+    two integer arrays mapping rank to player number and back, so a move only shifts a
+    slice of machine integers.
+    """
+
+    def __init__(
+        self,
+        season: models.Season,
+        order: Iterable[int],
+        saved: Optional[dict[int, int]] = None,
+    ):
+        """
+        Start from the given order of player pks, best first.
+
+        ``saved`` maps player pks to the ranks currently stored, it defaults to ``order``.
+        """
+        self.season = season
+        self.players: list[int] = []
+        self._number: dict[int, int] = {}
+        self._order = array("l")
+        self._position = array("l")
+        for player_pk in order:
+            self._add(player_pk)
+        self._saved = (
+            dict(saved) if saved is not None else {pk: i + 1 for i, pk in enumerate(self.order)}
+        )
+
+    @classmethod
+    def load(cls, season: models.Season) -> "Ladder":
+        """Load the current ranking of ``season``."""
+        return cls(season, season.ranks.order_by("rank").values_list("player_id", flat=True))
+
+    @property
+    def order(self) -> list[int]:
+        """The player pks, best first."""
+        return [self.players[number] for number in self._order]
+
+    def _add(self, player_pk: int) -> int:
+        number = len(self.players)
+        self.players.append(player_pk)
+        self._number[player_pk] = number
+        self._position.append(len(self._order))
+        self._order.append(number)
+        return number
+
+    def rank(self, player_pk: int) -> int:
+        """Get the rank of a player, adding them at the bottom if they have none yet."""
+        number = self._number.get(player_pk)
+        if number is None:
+            number = self._add(player_pk)
+        return self._position[number] + 1
+
+    def move(self, player_pk: int, new_rank: int) -> dict[int, int]:
+        """
+        Move a player to ``new_rank``, shifting the players in between by one.
+
+        Returns the new ranks of all the players that moved, by player pk.
+        """
+        old, new = self.rank(player_pk) - 1, new_rank - 1
+        if old == new:
+            return {}
+        if new < old:
+            self._order[new + 1 : old + 1] = self._order[new:old]
+        else:
+            self._order[old:new] = self._order[old + 1 : new + 1]
+        self._order[new] = self._number[player_pk]
+        changes = {}
+        for position in range(min(old, new), max(old, new) + 1):
+            number = self._order[position]
+            self._position[number] = position
+            changes[self.players[number]] = position + 1
+        return changes
+
+    def apply_result(
+        self, first_pk: int, second_pk: int, winner_pk: Optional[int]
+    ) -> dict[int, int]:
+        """Promote the winner if they were ranked lower than the loser, returning the moves."""
+        ranks = [self.rank(first_pk), self.rank(second_pk)]
+        lower_ranked_pk = first_pk if ranks[0] > ranks[1] else second_pk
+        if winner_pk == lower_ranked_pk:
+            return self.move(lower_ranked_pk, min(ranks))
+        return {}
+
+    def saved_rank(self, player_pk: int) -> Optional[int]:
+        """Get the stored rank of a player, if they have one."""
+        return self._saved.get(player_pk)
+
+    def changes(self) -> dict[int, int]:
+        """Map the pks of players whose rank differs from the stored one to their new rank."""
+        return {
+            player_pk: index + 1
+            for index, player_pk in enumerate(self.order)
+            if self._saved.get(player_pk) != index + 1
+        }
+
+    def save(self) -> dict[int, int]:
+        """Write the changed ranks with a rank event each, returning the changes."""
+        changes = self.changes()
+        if not changes:
+            return changes
+        with transaction.atomic():
+            existing = list(self.season.ranks.filter(player_id__in=changes))
+            for rank in existing:
+                rank.rank = changes[rank.player_id]
+            models.Rank.objects.bulk_update(existing, ["rank"], batch_size=500)
+            existing_pks = {rank.player_id for rank in existing}
+            models.Rank.objects.bulk_create(
+                models.Rank(season=self.season, player_id=player_pk, rank=rank)
+                for player_pk, rank in changes.items()
+                if player_pk not in existing_pks
+            )
+            self.season._record_rank_events(changes)
+            bump_season_version(self.season.pk)
+        self._saved.update(changes)
+        return changes
+
+
+@dataclasses.dataclass
+class RankChange:
+    """The ranks that changed because of one match."""
+
+    match_pk: int
+    date_played: Optional[datetime.datetime]
+    ranks: dict[int, int]
+
+
+@dataclasses.dataclass
+class Replay:
+    """The outcome of replaying a season: the final ladder and how it got there."""
+
+    ladder: Ladder
+    history: list[RankChange]
+
+
+def players_without_join_event(season: models.Season) -> list[int]:
+    """
+    Get the pks of the ranked players of a season without any rank event.
+
+    They joined before rank events were recorded, so the season's initial order is unknown.
+    """
+    return list(
+        season.ranks.exclude(player__rank_events__season=season)
+        .order_by("rank")
+        .values_list("player_id", flat=True)
+    )
+
+
+def initial_order(season: models.Season) -> list[int]:
+    """
+    Get the player pks in the order they joined the season.
+
+    That is the order of their first rank event. Players without any come after that,
+    in the order of their stored rank, which is their current rank and not where they
+    started: see ``players_without_join_event``.
+    """
+    joined = (
+        season.rank_events.values("player_id")
+        .annotate(first_timestamp=Min("timestamp"), first_id=Min("id"))
+        .order_by("first_timestamp", "first_id")
+        .values_list("player_id", flat=True)
+    )
+    order = list(joined)
+    known = set(order)
+    order += [
+        player_pk
+        for player_pk in season.ranks.order_by("rank").values_list("player_id", flat=True)
+        if player_pk not in known
+    ]
+    return order
+
+
+def replay(season: models.Season) -> Replay:
+    """
+    Replay the completed matches of a season from the initial order.
+
+    The matches are applied in the order they were played (by date, then pk), using their
+    stored winners. The ladder's changes are the differences to the stored ``Rank`` rows,
+    so saving it brings them in line with the replay.
+    """
+    ladder = Ladder(
+        season,
+        initial_order(season),
+        saved=dict(season.ranks.values_list("player_id", "rank")),
+    )
+    history = []
+    matches = (
+        season.matches.filter(completed=True)
+        .order_by("date_played", "pk")
+        .values_list("pk", "date_played", "first_player_id", "second_player_id", "winner_id")
+    )
+    for match_pk, date_played, first_pk, second_pk, winner_pk in matches.iterator():
+        ranks = ladder.apply_result(first_pk, second_pk, winner_pk)
+        if ranks:
+            history.append(RankChange(match_pk=match_pk, date_played=date_played, ranks=ranks))
+    return Replay(ladder=ladder, history=history)
@@ -0,0 +1,180 @@
+"""Elo skill ratings of the players in a season, next to the ladder rank."""
+
+import dataclasses
+from array import array
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from . import models
+from .caching import bump_season_version
+
+
+@dataclasses.dataclass(frozen=True)
+class EloParameters:
+    """
+    Parameters of the rating calculation.
+
+    Overridden by the ``LIGAPP_ELO`` setting, for example ``{"k_factor": 24}``. Ratings
+    recorded with other parameters are only consistent again after a recompute.
+    """
+
+    initial: float = 1500.0
+    k_factor: float = 32.0
+    scale: float = 400.0
+
+    @classmethod
+    def from_settings(cls) -> "EloParameters":
+        """Get the parameters configured for the site."""
+        return cls(**getattr(settings, "LIGAPP_ELO", {}))
+
+
+def outcome(first_pk: int, winner_pk: Optional[int]) -> float:
+    """Score of the first player: 1 for a win, 0 for a loss and 0.5 for a draw."""
+    if winner_pk is None:
+        return 0.5
+    return 1.0 if winner_pk == first_pk else 0.0
+
+
+def elo_update(
+    first: float, second: float, score: float, parameters: EloParameters
+) -> tuple[float, float]:
+    """Get the new ratings of two players, given the score of the first one."""
+    expected = 1 / (1 + 10 ** ((second - first) / parameters.scale))
+    delta = parameters.k_factor * (score - expected)
+    return first + delta, second - delta
+
+
+def update_ratings(match: models.Match, parameters: Optional[EloParameters] = None) -> None:
+    """Apply the result of a completed match to the ratings of its two players."""
+    if not match.completed or not match.season_id:
+        return
+    parameters = parameters or EloParameters.from_settings()
+    player_pks = [match.first_player_id, match.second_player_id]
+    with transaction.atomic():
+        ratings = {
+            rating.player_id: rating
+            for rating in models.Rating.objects.select_for_update().filter(
+                season_id=match.season_id, player_id__in=player_pks
+            )
+        }
+        first, second = (
+            ratings.get(player_pk)
+            or models.Rating(
+                season_id=match.season_id, player_id=player_pk, rating=parameters.initial
+            )
+            for player_pk in player_pks
+        )
+        first.rating, second.rating = elo_update(
+            first.rating, second.rating, outcome(match.first_player_id, match.winner_id), parameters
+        )
+        for rating in (first, second):
+            rating.matches_played += 1
+            rating.save()
+
+
+def bulk_update_ratings(
+    matches: Iterable[models.Match], parameters: Optional[EloParameters] = None
+) -> None:
+    """
+    Apply the results of many matches to the ratings, in the order the matches are given.
+
+    The same as ``update_ratings`` for one match after the other, but the ratings of the
+    players are read with one query, updated in memory and written back with another.
+    """
+    parameters = parameters or EloParameters.from_settings()
+    matches = [match for match in matches if match.completed and match.season_id]
+    keys = {
+        (match.season_id, player_pk)
+        for match in matches
+        for player_pk in (match.first_player_id, match.second_player_id)
+    }
+    if not keys:
+        return
+    with transaction.atomic():
+        ratings = {
+            (rating.season_id, rating.player_id): rating
+            for rating in models.Rating.objects.select_for_update().filter(
+                season_id__in={season_pk for season_pk, _ in keys},
+                player_id__in={player_pk for _, player_pk in keys},
+            )
+            if (rating.season_id, rating.player_id) in keys
+        }
+        for season_pk, player_pk in keys - ratings.keys():
+            ratings[season_pk, player_pk] = models.Rating(
+                season_id=season_pk, player_id=player_pk, rating=parameters.initial
+            )
+        for match in matches:
+            first = ratings[match.season_id, match.first_player_id]
+            second = ratings[match.season_id, match.second_player_id]
+            first.rating, second.rating = elo_update(
+                first.rating,
+                second.rating,
+                outcome(match.first_player_id, match.winner_id),
+                parameters,
+            )
+            first.matches_played += 1
+            second.matches_played += 1
+        models.Rating.objects.bulk_create(
+            ratings.values(),
+            update_conflicts=True,
+            unique_fields=["season", "player"],
+            update_fields=["rating", "matches_played"],
+        )
+        for season_pk in {season_pk for season_pk, _ in keys}:
+            bump_season_version(season_pk)
+
+
+def recompute(season: models.Season, parameters: Optional[EloParameters] = None) -> int:
+    """
+    Recompute the ratings of a season from all its completed matches, in date order.
+
+    The ratings are kept in plain arrays while going through the matches and written with a
+    few bulk queries at the end. Elo is sequential, every match depends on the ratings left
+    by the ones before, so there is nothing to vectorize across matches.
+    Returns the number of rated players.
+    """
+    parameters = parameters or EloParameters.from_settings()
+    number: dict[int, int] = {}
+    ratings = array("d")
+    played = array("l")
+
+    def number_of(player_pk: int) -> int:
+        if player_pk not in number:
+            number[player_pk] = len(ratings)
+            ratings.append(parameters.initial)
+            played.append(0)
+        return number[player_pk]
+
+    matches = (
+        season.matches.filter(completed=True)
+        .order_by("date_played", "pk")
+        .values_list("first_player_id", "second_player_id", "winner_id")
+    )
+    for first_pk, second_pk, winner_pk in matches.iterator(chunk_size=5000):
+        first, second = number_of(first_pk), number_of(second_pk)
+        ratings[first], ratings[second] = elo_update(
+            ratings[first], ratings[second], outcome(first_pk, winner_pk), parameters
+        )
+        played[first] += 1
+        played[second] += 1
+
+    with transaction.atomic():
+        existing = list(season.ratings.select_for_update())
+        for rating in existing:
+            index = number.pop(rating.player_id, None)
+            rating.rating = parameters.initial if index is None else ratings[index]
+            rating.matches_played = 0 if index is None else played[index]
+        models.Rating.objects.bulk_update(existing, ["rating", "matches_played"], batch_size=500)
+        models.Rating.objects.bulk_create(
+            models.Rating(
+                season=season,
+                player_id=player_pk,
+                rating=ratings[index],
+                matches_played=played[index],
+            )
+            for player_pk, index in number.items()
+        )
+        bump_season_version(season.pk)
+    return len(existing) + len(number)
@@ -0,0 +1,93 @@
+"""Ligapp form for recording a round of matches from a results sheet."""
+
+import io
+
+from crispy_forms import layout  # noqa: I900 # comes from django-crispy-forms
+from crispy_forms.helper import FormHelper  # noqa: I900
+from django import forms
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .importing import MatchRowValidator, make_builder, read_rows
+from .models import Season
+
+SHEET_COLUMNS = [
+    "first_player",
+    "second_player",
+    "first_score_1",
+    "second_score_1",
+    "first_score_2",
+    "second_score_2",
+    "first_score_3",
+    "second_score_3",
+    "date_played",
+    "match_type",
+    "minutes_played",
+]
+
+
+class ResultsSheetForm(forms.Form):
+    """
+    Form for pasting many results at once, one match per line.
+
+    The sheet is comma or tab separated (as copied from a spreadsheet) and starts with a
+    header line naming the columns. The rows are checked like ``NewMatchForm`` checks a single
+    match, every row is recorded in the season of the view and defaults to being played today.
+    """
+
+    sheet = forms.CharField(
+        label="",
+        widget=forms.Textarea(attrs={"rows": 12, "placeholder": ",".join(SHEET_COLUMNS[:6])}),
+        help_text="One match per line, after a header line with the columns "
+        + ", ".join(SHEET_COLUMNS)
+        + ". Players are given by name.",
+    )
+
+    def __init__(self, *args, season: Season, **kwargs):
+        """Validate the rows for ``season``."""
+        super().__init__(*args, **kwargs)
+        self.season = season
+        self.helper = self.get_helper()
+
+    def clean_sheet(self) -> str:
+        """Validate all rows, keeping a match builder per row in ``cleaned_data["builders"]``."""
+        sheet = self.cleaned_data["sheet"].strip()
+        header = sheet.partition("\n")[0]
+        file_format = "tsv" if "\t" in header else "csv"
+        validator = MatchRowValidator(self.season)
+        today = timezone.localdate().isoformat()
+        builders, errors = [], []
+        for row_nr, row in enumerate(read_rows(io.StringIO(sheet), file_format), start=1):
+            row = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+            if not any(row.values()):
+                continue
+            row.update(season=None, date_played=row.get("date_played") or today)
+            cleaned_data = validator.clean(row)
+            if cleaned_data is None:
+                errors.extend(
+                    ValidationError(f"Row {row_nr}, {field}: {message}")
+                    for field, messages in validator.errors.items()
+                    for message in messages
+                )
+            else:
+                builders.append(make_builder(cleaned_data))
+        if errors:
+            raise ValidationError(errors)
+        if not builders:
+            raise ValidationError("The sheet has no matches.")
+        self.cleaned_data["builders"] = builders
+        return sheet
+
+    def get_helper(self) -> FormHelper:
+        helper = FormHelper()
+        helper.layout = layout.Layout(
+            layout.Div("sheet", css_class="mb-3"),
+            layout.Div(
+                layout.Submit("submit", "Save", css_class="btn btn-success"),
+                layout.HTML(
+                    f"<a href={self.season.get_absolute_url()} class='btn btn-danger'>Cancel</a>"
+                ),
+                css_class="mb-3",
+            ),
+        )
+        return helper
@@ -0,0 +1,71 @@
+"""Signal handlers invalidating cached season pages on changes outside of the write paths."""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import models
+from .caching import bump_season_version
+
+
+@receiver(post_save, sender=models.Season)
+@receiver(post_delete, sender=models.Season)
+def invalidate_season(sender, instance, **kwargs):
+    """Invalidate a changed season (e.g. in the admin)."""
+    bump_season_version(instance.pk)
+
+
+@receiver(post_save, sender=models.Match)
+@receiver(post_delete, sender=models.Match)
+@receiver(post_save, sender=models.MultiSetMatch)
+@receiver(post_delete, sender=models.MultiSetMatch)
+@receiver(post_save, sender=models.TimedMatch)
+@receiver(post_delete, sender=models.TimedMatch)
+@receiver(post_save, sender=models.Rank)
+@receiver(post_delete, sender=models.Rank)
+@receiver(post_save, sender=models.Rating)
+@receiver(post_delete, sender=models.Rating)
+def invalidate_season_of_instance(sender, instance, **kwargs):
+    """Invalidate the season of a changed match, rank or rating."""
+    if instance.season_id:
+        bump_season_version(instance.season_id)
+
+
+@receiver(post_save, sender=models.Set)
+@receiver(post_delete, sender=models.Set)
+def invalidate_season_of_set(sender, instance, **kwargs):
+    """Invalidate the season of the match of a changed set, looked up if not loaded yet."""
+    if models.Set.match.is_cached(instance):
+        season_pk = instance.match.season_id
+    else:
+        season_pk = (
+            models.Match.objects.filter(pk=instance.match_id)
+            .values_list("season_id", flat=True)
+            .first()
+        )
+    if season_pk:
+        bump_season_version(season_pk)
+
+
+@receiver(post_save, sender=models.Player)
+@receiver(pre_delete, sender=models.Player)
+def invalidate_seasons_of_player(sender, instance, **kwargs):
+    """
+    Invalidate the seasons of a changed player, they show actions depending on the user.
+
+    A deleted player is looked up before the deletion removes them from their seasons.
+    """
+    for season_pk in instance.season_set.values_list("pk", flat=True):
+        bump_season_version(season_pk)
+
+
+@receiver(m2m_changed, sender=models.Season.participants.through)
+@receiver(m2m_changed, sender=models.Season.admins.through)
+def invalidate_season_members(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate seasons when their participants or admins change."""
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        bump_season_version(instance.pk)
+    else:
+        for season_pk in pk_set or []:
+            bump_season_version(season_pk)
@@ -1,11 +1,27 @@
 """Player stats utilities."""
 
-import collections
+import asyncio
 import dataclasses
+import hashlib
+from typing import Any, Iterable
 
 from django.contrib.auth.models import User
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    When,
+)
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 
 from . import models
+from .caching import season_versions
 
 
 @dataclasses.dataclass
@@ -26,57 +42,84 @@ class Head2Head:
             season__admins=self.user,
         )
 
-    def count_wins(self, matches) -> collections.Counter[models.Player]:
-        win_counter: collections.Counter[models.Player] = collections.Counter()
-        for match in matches:
-            win_counter.update([match.child.winner])
-        return win_counter
-
-    def count_sets(self, matches) -> collections.Counter[models.Player]:
-        won_sets: collections.Counter[models.Player] = collections.Counter()
-        for match in matches:
-            for set in match.sets.all():
-                won_sets.update([set.winner])
-        return won_sets
+    def _sum_for(self, player: models.Player, first_field: str, second_field: str) -> Coalesce:
+        """Sum up a result column from the point of view of ``player``."""
+        return Coalesce(
+            Sum(
+                Case(
+                    When(first_player=player, then=F(first_field)),
+                    default=F(second_field),
+                )
+            ),
+            0,
+        )
 
-    def count_points(self, matches) -> collections.Counter[models.Player]:
-        won_points: collections.Counter[models.Player] = collections.Counter()
-        for match in matches:
-            for set in match.sets.all():
-                won_points.update({match.first_player: set.first_score})
-                won_points.update({match.second_player: set.second_score})
-        return won_points
+    def _totals_aggregates(self) -> dict[str, Any]:
+        return {
+            "matches": Count("pk"),
+            "first_wins": Count("pk", filter=Q(winner=self.first)),
+            "second_wins": Count("pk", filter=Q(winner=self.second)),
+            "first_sets": self._sum_for(self.first, "first_sets_won", "second_sets_won"),
+            "second_sets": self._sum_for(self.second, "first_sets_won", "second_sets_won"),
+            "first_won_points": self._sum_for(self.first, "first_points", "second_points"),
+            "second_won_points": self._sum_for(self.second, "first_points", "second_points"),
+        }
+
+    def totals(self) -> dict[str, int]:
+        """Aggregate the number of matches and wins, sets and points per player in one query."""
+        return self.matches.aggregate(**self._totals_aggregates())
+
+    def _rank_of(self, player: models.Player) -> Subquery:
+        """Subquery for the rank of ``player`` in the outer season."""
+        return Subquery(
+            models.Rank.objects.filter(season=OuterRef("pk"), player=player).values("rank")[:1]
+        )
 
-    @property
-    def season_stats(self):
-        seasons = (
+    def shared_seasons(self) -> models.SeasonQuerySet:
+        """The seasons administered by the user in which both players take part."""
+        return (
             models.Season.objects.filter(admins=self.user)
             .filter(participants=self.first.pk)
             .filter(participants=self.second.pk)
         )
-        return [
-            (
-                season,
-                models.Rank.objects.get(season=season, player=self.first).rank,
-                models.Rank.objects.get(season=season, player=self.second).rank,
-            )
-            for season in seasons
-        ]
 
-    @property
+    def version(self) -> str:
+        """
+        Digest of the pair's last match and the versions of their shared seasons.
+
+        Changes whenever the stats or ranks shown for the pair may have changed.
+        """
+        last_match = self.matches.aggregate(count=Count("pk"), last=Max("pk"))
+        season_pks = self.shared_seasons().values_list("pk", flat=True)
+        state = (
+            last_match["count"],
+            last_match["last"],
+            sorted(season_versions(season_pks).items()),
+        )
+        return hashlib.sha1(repr(state).encode(), usedforsecurity=False).hexdigest()
+
+    def _seasons_with_ranks(self) -> models.SeasonQuerySet:
+        return self.shared_seasons().annotate(
+            first_rank=self._rank_of(self.first), second_rank=self._rank_of(self.second)
+        )
+
+    @cached_property
+    def season_stats(self):
+        seasons = self._seasons_with_ranks()
+        return [(season, season.first_rank, season.second_rank) for season in seasons]
+
+    @cached_property
     def stats(self):
-        matches = self.matches
-        wins = self.count_wins(matches)
-        sets = self.count_sets(matches)
-        points = self.count_points(matches)
+        return self._stat_lines(self.totals())
 
+    def _stat_lines(self, totals: dict[str, int]):
         def make_stat_line(name, stat):
             total = sum(stat)
             if total == 0:
                 return [name, [(stat[0],), (stat[1],)]]
             return (name, [(stat_i, stat_i / total * 100) for stat_i in stat])
 
-        if not matches:
+        if not totals["matches"]:
             return [
                 ("Matches", [(0,), (0,)]),
                 ("Sets", [(0,), (0,)]),
@@ -87,14 +130,36 @@ class Head2Head:
             ]
 
         stats = [
-            make_stat_line("Matches", (wins[self.first], wins[self.second])),
-            make_stat_line("Sets", (sets[self.first], sets[self.second])),
-            make_stat_line("Points", (points[self.first], points[self.second])),
+            make_stat_line("Matches", (totals["first_wins"], totals["second_wins"])),
+            make_stat_line("Sets", (totals["first_sets"], totals["second_sets"])),
+            make_stat_line("Points", (totals["first_won_points"], totals["second_won_points"])),
         ]
         return stats
 
-    def matches_by_date(self):
+    def _history(self) -> models.MatchQuerySet:
+        return self.matches.with_details().order_by("-date_played")
+
+    def _group_by_date_played(self, matches: Iterable[models.Match]):
         result = {}
-        for match in self.matches.order_by("-date_played"):
+        for match in matches:
             result.setdefault(match.date_played, []).append(match)
         return result.items()
+
+    @cached_property
+    def matches_by_date(self):
+        return self._group_by_date_played(self._history())
+
+    async def apreload(self) -> None:
+        """
+        Load the stats, the season stats and the match history with concurrent async queries.
+
+        Fills in the ``stats``, ``season_stats`` and ``matches_by_date`` properties.
+        """
+        totals, seasons, matches = await asyncio.gather(
+            self.matches.aaggregate(**self._totals_aggregates()),
+            models.alist(self._seasons_with_ranks()),
+            models.alist(self._history()),
+        )
+        self.stats = self._stat_lines(totals)
+        self.season_stats = [(s, s.first_rank, s.second_rank) for s in seasons]
+        self.matches_by_date = self._group_by_date_played(matches)
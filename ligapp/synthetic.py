@@ -0,0 +1,138 @@
+"""Synthetic leagues of configurable size, for benchmarks and load tests."""
+
+import dataclasses
+import datetime
+import random
+from typing import Iterator
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import models
+from .match_builder import MatchBuilder, bulk_build
+from .ranking import Ladder
+from .rating import recompute
+
+
+@dataclasses.dataclass
+class LeagueSize:
+    """How big a generated league is. Matches and planned matches are per season."""
+
+    players: int = 40
+    seasons: int = 1
+    matches: int = 1000
+    max_sets: int = 3
+    planned: int = 10
+    timed_share: float = 0.1
+    seed: int = 0
+
+
+class LeagueGenerator:
+    """
+    Generate seasons with random but valid results, ranks, rank events and ratings.
+
+    The results are written with ``bulk_build`` and applied to a ``Ladder``, so the stored
+    ranking is the one recording the matches one by one would give. The ranking is saved
+    after every batch, which gives a ranking history in steps of ``batch_size`` matches.
+    The same size and seed always give the same league.
+    """
+
+    batch_size = 1000
+
+    def __init__(self, size: LeagueSize, prefix: str = "Synthetic", batch_size: int = 0):
+        """Names of the generated players and seasons start with ``prefix``."""
+        self.size = size
+        self.batch_size = batch_size or self.batch_size
+        self.prefix = prefix
+        self.rng = random.Random(size.seed)  # noqa: S311  # reproducible data, not security
+
+    def generate(self) -> list[models.Season]:
+        """Create the players and all the seasons."""
+        players = self.create_players()
+        return [self.generate_season(players, number) for number in range(self.size.seasons)]
+
+    def create_players(self) -> list[models.Player]:
+        return models.Player.objects.bulk_create(
+            models.Player(name=f"{self.prefix} Player {i}") for i in range(self.size.players)
+        )
+
+    def generate_season(self, players: list[models.Player], number: int) -> models.Season:
+        """Create a season with all the players in a random initial order."""
+        start = timezone.make_aware(datetime.datetime(2020, 1, 1)) + datetime.timedelta(
+            days=365 * number
+        )
+        with transaction.atomic():
+            season = models.Season.objects.create(
+                name=f"{self.prefix} Season {number + 1}", start_date=start
+            )
+            season.participants.add(*players)
+            order = self.rng.sample(players, len(players))
+            models.Rank.objects.bulk_create(
+                models.Rank(season=season, player=player, rank=rank)
+                for rank, player in enumerate(order, start=1)
+            )
+            season._record_rank_events({player.pk: rank for rank, player in enumerate(order, 1)})
+            ladder = Ladder(season, [player.pk for player in order])
+            batch: list[MatchBuilder] = []
+            for builder in self.builders(season, players, start):
+                batch.append(builder)
+                if len(batch) >= self.batch_size:
+                    self._build(batch, ladder)
+                    batch = []
+            self._build(batch, ladder)
+            recompute(season)
+        return season
+
+    def builders(
+        self, season: models.Season, players: list[models.Player], start: datetime.datetime
+    ) -> Iterator[MatchBuilder]:
+        """Make the builders for the completed matches, oldest first, then the planned ones."""
+        per_day = max(1, len(players) // 4)
+        for i in range(self.size.matches):
+            first, second = self.rng.sample(players, 2)
+            builder = MatchBuilder(
+                season=season,
+                first_player=first,
+                second_player=second,
+                date_played=start + datetime.timedelta(days=i // per_day, minutes=i % per_day),
+            )
+            if self.rng.random() < self.size.timed_share:
+                builder.make_timed().set_minutes_played(self.rng.randrange(10, 30))
+                builder.add_score(*self.rng.sample(range(5, 25), 2))
+            else:
+                for first_score, second_score in self.sets():
+                    builder.add_score(first_score, second_score)
+            yield builder
+        last_played = start + datetime.timedelta(days=self.size.matches // per_day)
+        for i in range(self.size.planned):
+            first, second = self.rng.sample(players, 2)
+            yield MatchBuilder(
+                season=season,
+                first_player=first,
+                second_player=second,
+                date_planned=last_played + datetime.timedelta(days=1 + i // per_day),
+            ).set_completed(False)
+
+    def sets(self) -> list[tuple[int, int]]:
+        """Random regulation sets to 21 of a best of ``max_sets`` match."""
+        to_win = self.size.max_sets // 2 + 1
+        wins = [0, 0]
+        scores = []
+        while max(wins) < to_win:
+            winner = self.rng.randrange(2)
+            wins[winner] += 1
+            loser_score = self.rng.randrange(20)
+            scores.append((21, loser_score) if winner == 0 else (loser_score, 21))
+        return scores
+
+    def _build(self, batch: list[MatchBuilder], ladder: Ladder) -> None:
+        """Save a batch and its ranking changes, which adds a step to the ranking history."""
+        for match in bulk_build(batch):
+            if match.completed:
+                ladder.apply_result(match.first_player_id, match.second_player_id, match.winner_id)
+        ladder.save()
+
+
+def generate_league(size: LeagueSize, prefix: str = "Synthetic") -> list[models.Season]:
+    """Generate a league of the given size, see ``LeagueGenerator``."""
+    return LeagueGenerator(size, prefix).generate()
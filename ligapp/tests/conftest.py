@@ -1 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ligapp.match_builder import MatchBuilder
+
 from .model_fixtures import *  # noqa
+from .query_budget import QUERY_BUDGETS
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Do not let cached fragments leak from one test into the next."""
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def add_matches():
+    """Provide a function recording ``n`` completed and ``n`` planned matches of both types."""
+
+    def add(season, player, other_player, n):
+        start = timezone.make_aware(datetime(2000, 1, 1))
+        for i in range(n):
+            builder = MatchBuilder(
+                season=season,
+                first_player=player,
+                second_player=other_player,
+                date_played=start + timedelta(days=i),
+            )
+            if i % 2:
+                builder.make_timed().set_minutes_played(20).add_score(11, 15)
+            else:
+                builder.add_score(21, 15).add_score(7, 21).add_score(21, 19)
+            builder.build()
+            MatchBuilder(
+                season=season,
+                first_player=player,
+                second_player=other_player,
+                date_planned=start + timedelta(days=i),
+            ).plan()
+
+    return add
+
+
+@pytest.fixture
+def assert_query_budget():
+    """
+    Check that a page stays within the query budget of its url name, see ``query_budget``.
+
+    Call with a logged in client, the url name and the url kwargs, returns the number of
+    queries. The page is rendered without cached fragments and streamed responses are
+    consumed (except event streams, which do not end).
+    """
+
+    def check(client, url_name, **kwargs):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(reverse(f"ligapp:{url_name}", kwargs=kwargs))
+            if response.streaming and response["Content-Type"] != "text/event-stream":
+                b"".join(response.streaming_content)
+        assert response.status_code == 200
+        budget = QUERY_BUDGETS[url_name]
+        queries = "\n".join(query["sql"] for query in context.captured_queries)
+        assert len(context) <= budget, f"{url_name}: {len(context)} queries:\n{queries}"
+        return len(context)
+
+    return check
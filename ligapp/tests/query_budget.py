@@ -0,0 +1,37 @@
+"""
+Query budgets of the ligapp views, by url name.
+
+Every url name in ``ligapp.urls`` needs a budget, see ``test_query_budgets``. A budget is
+the maximum number of queries for rendering the page without cached fragments, including
+the session and user lookups. It must hold no matter how much data the page shows, so a
+new N+1 query in a view or template fails the test once the data grows.
+"""
+
+from ligapp.urls import urlpatterns
+
+QUERY_BUDGETS = {
+    "index": 5,
+    "season-detail": 10,
+    "season-ranking": 4,
+    "season-match-history": 5,
+    "season-events": 3,
+    "add-season": 4,
+    "match-detail": 7,
+    "match-complete": 16,
+    "plan-match": 10,
+    "new-match": 10,
+    "new-match-as-player": 12,
+    "add-player": 9,
+    "results-sheet": 5,
+    "head2head": 10,
+    "api-seasons": 4,
+    "api-season": 4,
+    "api-season-ranking": 4,
+    "api-season-matches": 5,
+    "api-head2head": 8,
+}
+
+
+def url_names() -> set[str]:
+    """All the url names of the app."""
+    return {pattern.name for pattern in urlpatterns}
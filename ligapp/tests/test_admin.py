@@ -0,0 +1,37 @@
+"""Test the admin editors."""
+
+from types import SimpleNamespace
+
+import pytest
+from django.contrib import admin
+
+from ligapp import models
+from ligapp.admin import MatchResultAdmin
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "model, fixture",
+    [
+        (models.Match, "sets_match"),
+        (models.Match, "timed_match"),
+        (models.MultiSetMatch, "sets_match"),
+        (models.TimedMatch, "timed_match"),
+    ],
+)
+def test_match_admin_updates_result(model, fixture, request, other_player):
+    """Test that every match editor stores the result of the sets edited inline."""
+    match = model.objects.get(pk=request.getfixturevalue(fixture).pk)
+    match.sets.create(first_score=10, second_score=12, order=1)
+    match.sets.create(first_score=21, second_score=5, order=2)
+    form = SimpleNamespace(instance=match, save_m2m=lambda: None)
+    MatchResultAdmin(model, admin.site).save_related(None, form, [], change=True)
+    match.refresh_from_db()
+    # a timed match is decided by its first set, a sets match at one set all is a draw
+    winner = other_player if fixture == "timed_match" else None
+    assert (match.winner, match.second_sets_won, match.second_points) == (winner, 1, 17)
+
+
+def test_sets_only_edited_inline():
+    """Test that sets can not be edited without updating the result of their match."""
+    assert not admin.site.is_registered(models.Set)
@@ -0,0 +1,112 @@
+"""Test the read-only JSON API."""
+
+import datetime
+import json
+
+import pytest
+from django.test.client import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from ligapp import models
+from ligapp.match_builder import MatchBuilder
+
+
+@pytest.fixture
+def api_client(season_admin):
+    client = Client()
+    client.force_login(season_admin)
+    yield client
+
+
+def record_match(season, first, second, day, scores=((21, 15),)):
+    builder = MatchBuilder(
+        season=season,
+        first_player=first,
+        second_player=second,
+        date_played=timezone.make_aware(datetime.datetime(2024, 3, day)),
+    )
+    for score in scores:
+        builder.add_score(*score)
+    return builder.build()
+
+
+def content(response):
+    if response.streaming:
+        return json.loads(b"".join(response.streaming_content))
+    return response.json()
+
+
+@pytest.mark.django_db
+def test_api_login_required(season):
+    """Test that anonymous requests are refused without a login redirect."""
+    response = Client().get(reverse("ligapp:api-season", kwargs={"pk": season.pk}))
+    assert response.status_code == 403
+
+
+@pytest.mark.django_db
+def test_api_seasons(api_client, season):
+    """Test that only the seasons of the user are listed."""
+    models.Season.objects.create(name="Other Season", start_date=timezone.now())
+    response = api_client.get(reverse("ligapp:api-seasons"))
+    assert [(s["name"], s["is_admin"]) for s in content(response)] == [("Test Season", True)]
+
+
+@pytest.mark.django_db
+def test_api_season_conditional_get(
+    api_client, two_player_season, player, other_player, django_capture_on_commit_callbacks
+):
+    """Test that unchanged seasons give a 304 and new matches a new ETag."""
+    url = reverse("ligapp:api-season-ranking", kwargs={"pk": two_player_season.pk})
+    response = api_client.get(url)
+    assert [(r["rank"], r["player"]["name"]) for r in content(response)] == [
+        (1, "Test Player"),
+        (2, "Other Player"),
+    ]
+    etag = response["ETag"]
+    assert api_client.get(url, headers={"if-none-match": etag}).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        record_match(two_player_season, other_player, player, 1)
+    response = api_client.get(url, headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+    ranking = content(response)
+    assert [r["player"]["name"] for r in ranking] == ["Other Player", "Test Player"]
+    assert ranking[0]["rating"] == pytest.approx(1516)
+
+
+@pytest.mark.django_db
+def test_api_season_matches(
+    api_client, two_player_season, player, other_player, django_assert_max_num_queries
+):
+    """Test that the matches are streamed with their sets, in a fixed number of queries."""
+    for day in range(1, 21):
+        record_match(two_player_season, player, other_player, day, [(21, 15), (19, 21)])
+    MatchBuilder(
+        season=two_player_season, first_player=player, second_player=other_player
+    ).make_timed().set_minutes_played(15).plan()
+    url = reverse("ligapp:api-season-matches", kwargs={"pk": two_player_season.pk})
+    with django_assert_max_num_queries(6):
+        response = api_client.get(url)
+        matches = content(response)
+    assert response.streaming
+    assert len(matches) == 20
+    assert matches[0]["date_played"].startswith("2024-03-20")
+    assert matches[0]["sets"] == [[21, 15], [19, 21]]
+    assert matches[0]["type"] == "Points"
+    assert (matches[0]["winner"], matches[0]["points"]) == (None, [40, 36])
+    planned = content(api_client.get(url, {"status": "planned"}))
+    assert [(m["type"], m["completed"]) for m in planned] == [("Time", False)]
+
+
+@pytest.mark.django_db
+def test_api_head2head(api_client, two_player_season, player, other_player):
+    """Test the head-to-head stats and that they have an ETag."""
+    record_match(two_player_season, other_player, player, 1)
+    url = reverse("ligapp:api-head2head", kwargs={"first": player.pk, "second": other_player.pk})
+    response = api_client.get(url)
+    data = content(response)
+    assert (data["matches"], data["wins"], data["points"]) == (1, [0, 1], [15, 21])
+    assert [s["ranks"] for s in data["seasons"]] == [[2, 1]]
+    assert api_client.get(url, headers={"if-none-match": response["ETag"]}).status_code == 304
@@ -0,0 +1,121 @@
+"""Test the async season detail and head-to-head views against the sync ones."""
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import AsyncRequestFactory, RequestFactory
+
+from ligapp import async_views, models, views
+from ligapp.caching import season_version
+from ligapp.stats import Head2Head
+
+
+def render_sync(view_class, user, headers=None, **kwargs):
+    request = RequestFactory().get("/page", headers=headers)
+    request.user = user
+    response = view_class.as_view()(request, **kwargs)
+    response.render()
+    return response
+
+
+def render_async(view_class, user, headers=None, **kwargs):
+    async def auser():
+        return user
+
+    request = AsyncRequestFactory().get("/page", headers=headers)
+    request.auser = auser
+    return async_to_sync(view_class.as_view())(request, **kwargs)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+@pytest.mark.django_db(transaction=True)
+def test_async_season_detail(
+    cached, two_player_season, season_admin, player, other_player, add_matches
+):
+    """Test that the async view renders the same page, with or without cached fragments."""
+    add_matches(two_player_season, player, other_player, 3)
+    expected = render_sync(views.SeasonDetailView, season_admin, pk=two_player_season.pk)
+    if not cached:
+        version = season_version(two_player_season.pk)
+        cache.delete_many(
+            make_template_fragment_key(fragment, [two_player_season.pk, version])
+            for fragment in async_views.AsyncSeasonDetailView.fragments
+        )
+    response = render_async(
+        async_views.AsyncSeasonDetailView, season_admin, pk=two_player_season.pk
+    )
+    assert response.status_code == 200
+    assert response.content == expected.content
+    assert response["ETag"] == expected["ETag"]
+
+    response = render_async(
+        async_views.AsyncSeasonDetailView,
+        season_admin,
+        headers={"if-none-match": expected["ETag"]},
+        pk=two_player_season.pk,
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_head2head(two_player_season, season_admin, player, other_player, add_matches):
+    """Test that the async view renders the same page and answers 304 when unchanged."""
+    add_matches(two_player_season, player, other_player, 3)
+    pair = {"first": player.pk, "second": other_player.pk}
+    expected = render_sync(views.Head2HeadView, season_admin, **pair)
+    response = render_async(async_views.AsyncHead2HeadView, season_admin, **pair)
+    assert response.status_code == 200
+    assert response.content == expected.content
+
+    response = render_async(
+        async_views.AsyncHead2HeadView,
+        season_admin,
+        headers={"if-none-match": expected["ETag"]},
+        **pair,
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_login_required(two_player_season):
+    """Test that anonymous users are redirected to the login page."""
+    response = render_async(
+        async_views.AsyncSeasonDetailView, AnonymousUser(), pk=two_player_season.pk
+    )
+    assert response.status_code == 302
+    assert "login" in response["Location"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_preload(
+    two_player_season, season_admin, player, other_player, django_assert_num_queries, add_matches
+):
+    """Test that the preloaded sections and stats are displayed without further queries."""
+    add_matches(two_player_season, player, other_player, 3)
+    season = models.Season.objects.get(pk=two_player_season.pk)
+    async_to_sync(season.apreload)("latest_matches", "top_16", "planned_matches")
+    h2h = Head2Head(player, other_player, season_admin)
+    async_to_sync(h2h.apreload)()
+    with django_assert_num_queries(0):
+        assert len([m for _, group in season.latest_matches for m in group]) == 3
+        assert [m.winner_id for _, group in season.latest_matches for m in group][0]
+        assert len([m for _, group in season.planned_matches for m in group]) == 3
+        assert [rank.player.name for rank in season.top_16] == [player.name, other_player.name]
+        assert [m.winner_id for _, group in h2h.matches_by_date for m in group][0]
+        assert h2h.stats and h2h.season_stats
+
+
+def test_async_page_view_needs_get_page():
+    """Test that a page view without an async get_page is refused when it is defined."""
+    with pytest.raises(TypeError, match="get_page"):
+
+        class NoPage(async_views.AsyncConditionalPageView):
+            pass
+
+    with pytest.raises(TypeError, match="get_page"):
+
+        class SyncPage(async_views.AsyncConditionalPageView):
+            def get_page(self, request):
+                return None
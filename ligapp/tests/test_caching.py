@@ -0,0 +1,124 @@
+"""Test that the season cache versions are coherent across worker processes."""
+
+import multiprocessing
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ligapp import caching, models
+
+N_WORKERS = 4
+SEASON_PK = 1
+
+
+def worker(index, barrier, results):
+    """Read the season version before and after worker 0 bumped it."""
+    before = caching.season_version(SEASON_PK)
+    cache.set(f"fragment:{before}", f"rendered by worker {index}")
+    barrier.wait()
+    if index == 0:
+        caching._bump(SEASON_PK)
+    barrier.wait()
+    after = caching.season_version(SEASON_PK)
+    results.put((index, before, after, cache.get(f"fragment:{after}")))
+
+
+@pytest.fixture
+def shared_cache(tmp_path):
+    """Use the file based default cache in a fresh directory."""
+    caches = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": tmp_path,
+        }
+    }
+    with override_settings(CACHES=caches):
+        yield cache
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="needs fork start method"
+)
+def test_season_version_coherent_across_processes(shared_cache):
+    """Test that all workers see the same versions and one worker's invalidation."""
+    caching.season_version(SEASON_PK)
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(N_WORKERS)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(i, barrier, results)) for i in range(N_WORKERS)
+    ]
+    for process in processes:
+        process.start()
+    outcome = sorted(results.get(timeout=30) for _ in processes)
+    for process in processes:
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    versions_before = {before for _, before, _, _ in outcome}
+    versions_after = {after for _, _, after, _ in outcome}
+    assert len(versions_before) == 1
+    assert len(versions_after) == 1
+    assert versions_after != versions_before
+    assert all(fragment is None for *_, fragment in outcome)
+
+
+def test_bump_moves_forward(shared_cache):
+    """Test that consecutive bumps always produce a new, larger version."""
+    versions = [caching.season_version(SEASON_PK)]
+    for _ in range(5):
+        caching._bump(SEASON_PK)
+        versions.append(caching.season_version(SEASON_PK))
+    assert versions == sorted(set(versions))
+
+
+@pytest.mark.django_db
+def test_model_changes_invalidate_season(
+    sets_match, season_admin, django_capture_on_commit_callbacks
+):
+    """Test that saving models outside of the write paths (the admin) invalidates the season."""
+    season = sets_match.season
+    versions = [caching.season_version(season.pk)]
+    with django_capture_on_commit_callbacks(execute=True):
+        sets_match.save()
+    versions.append(caching.season_version(season.pk))
+    with django_capture_on_commit_callbacks(execute=True):
+        season.admins.remove(season_admin)
+    versions.append(caching.season_version(season.pk))
+    with django_capture_on_commit_callbacks(execute=True):
+        sets_match.delete()
+    versions.append(caching.season_version(season.pk))
+    assert versions == sorted(set(versions))
+
+
+@pytest.mark.django_db
+def test_only_season_models_invalidate(
+    sets_match, season_admin, django_capture_on_commit_callbacks
+):
+    """Test that saving unrelated models leaves the seasons cached, unlike changing a set."""
+    season = sets_match.season
+    version = caching.season_version(season.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        season_admin.save()
+    assert caching.season_version(season.pk) == version
+    with (
+        django_capture_on_commit_callbacks(execute=True),
+        CaptureQueriesContext(connection) as context,
+    ):
+        sets_match.sets.create(first_score=21, second_score=10, order=1)
+    assert caching.season_version(season.pk) > version
+    assert len(context.captured_queries) == 1
+
+
+@pytest.mark.django_db
+def test_deleted_player_invalidates(season, django_capture_on_commit_callbacks):
+    """Test that deleting a player invalidates the seasons they took part in."""
+    player = models.Player.objects.create(name="Leaving")
+    season.participants.add(player)
+    version = caching.season_version(season.pk)
+    with django_capture_on_commit_callbacks(execute=True):
+        player.delete()
+    assert caching.season_version(season.pk) > version
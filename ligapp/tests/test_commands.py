@@ -0,0 +1,189 @@
+"""Test the ligapp management commands."""
+
+import io
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from ligapp import models
+
+
+@pytest.mark.django_db
+def test_backfill_match_results(timed_match, sets_match, get_sets):
+    """Test that missing results are filled in and existing ones are left alone."""
+    for score_set in get_sets(sets_match):
+        score_set.save()
+    get_sets(timed_match)[1].save()
+    call_command("backfill_match_results")
+    sets_match.refresh_from_db()
+    timed_match.refresh_from_db()
+    assert sets_match.winner == sets_match.second_player
+    assert (sets_match.first_points, sets_match.second_points) == (48, 49)
+    assert timed_match.winner == timed_match.second_player
+    assert (timed_match.first_sets_won, timed_match.second_sets_won) == (0, 1)
+
+    models.Match.objects.filter(pk=sets_match.pk).update(first_points=0)
+    call_command("backfill_match_results")
+    assert models.Match.objects.get(pk=sets_match.pk).first_points == 0
+    call_command("backfill_match_results", "--all")
+    assert models.Match.objects.get(pk=sets_match.pk).first_points == 48
+
+
+IMPORT_CSV = "\n".join(
+    [
+        "first_player,second_player,match_type,minutes_played,date_played,"
+        "first_score_1,second_score_1,first_score_2,second_score_2,first_score_3,second_score_3",
+        "Player 2,Player 0,Points,,2024-03-01,21,15,21,19,,",
+        "Player 1,Player 2,Time,15,2024-03-02,10,12,,,,",
+        "Player 0,Player 1,Points,,2024-03-03,21,10,18,21,21,19",
+    ]
+)
+
+
+@pytest.fixture
+def import_season(season):
+    """Provide a season with three players, ranked in the order of their names."""
+    for i in range(3):
+        season.create_player(name=f"Player {i}")
+    yield season
+
+
+def ranking(season):
+    return list(season.ranks.values_list("player__name", flat=True))
+
+
+@pytest.mark.django_db
+def test_import_matches(import_season, tmp_path, django_capture_on_commit_callbacks):
+    """Test importing matches and sets, with the ranking updated as if added one by one."""
+    path = tmp_path / "matches.csv"
+    path.write_text(IMPORT_CSV)
+    with django_capture_on_commit_callbacks():
+        call_command("import_matches", str(path), "--season", str(import_season.pk))
+    matches = list(import_season.matches.order_by("date_played"))
+    assert [m.match_type for m in matches] == ["Points", "Time", "Points"]
+    assert [m.score_str for m in matches] == [
+        "21 : 15, 21 : 19",
+        "10 : 12",
+        "21 : 10, 18 : 21, 21 : 19",
+    ]
+    assert matches[1].child.minutes_played == 15
+    assert [m.winner.name for m in matches] == ["Player 2", "Player 2", "Player 0"]
+    assert (matches[2].first_sets_won, matches[2].first_points) == (2, 60)
+    assert ranking(import_season) == ["Player 2", "Player 0", "Player 1"]
+    player_2 = models.Player.objects.get(name="Player 2")
+    assert list(player_2.rank_events.values_list("rank", flat=True)) == [3, 1]
+
+
+@pytest.mark.django_db
+def test_import_matches_jsonl_batches(import_season, tmp_path, django_assert_max_num_queries):
+    """Test that the number of queries does not grow with the number of matches."""
+    path = tmp_path / "matches.jsonl"
+    row = {
+        "season": import_season.pk,
+        "first_player": "Player 1",
+        "second_player": "Player 2",
+        "date_played": "2024-03-01T18:00:00",
+        "first_score_1": 21,
+        "second_score_1": 11,
+    }
+    path.write_text("\n".join(json.dumps(row) for _ in range(200)))
+    with django_assert_max_num_queries(25):
+        call_command("import_matches", str(path), "--batch-size", "100")
+    assert import_season.matches.count() == 200
+    assert models.Set.objects.filter(match__season=import_season).count() == 200
+    assert ranking(import_season) == ["Player 0", "Player 1", "Player 2"]
+
+
+@pytest.mark.django_db
+def test_import_matches_invalid(import_season, player, tmp_path):
+    """Test that invalid rows are reported and nothing is imported unless they are skipped."""
+    path = tmp_path / "matches.csv"
+    lines = IMPORT_CSV.splitlines()
+    lines[2] = "Player 1,Test Player,Points,,2024-03-02,21,21,,,,"
+    lines.append("Player 1,Nobody,Time,,2024-03-02,10,12,,,,")
+    path.write_text("\n".join(lines))
+    stderr = io.StringIO()
+    with pytest.raises(CommandError, match="2 rows are invalid"):
+        call_command("import_matches", str(path), "--season", str(import_season.pk), stderr=stderr)
+    assert not models.Match.objects.exists()
+    assert stderr.getvalue().splitlines() == [
+        "Row 2, second_player: Is not a participant in this season.",
+        "Row 2, first_score_1: Scores in set must be different.",
+        "Row 2, second_score_1: Scores in set must be different.",
+        "Row 4, second_player: Unknown player.",
+        "Row 4, minutes_played: Required for a match played for time.",
+    ]
+
+    call_command(
+        "import_matches",
+        str(path),
+        "--season",
+        str(import_season.pk),
+        "--skip-invalid",
+        stderr=io.StringIO(),
+    )
+    assert import_season.matches.count() == 2
+
+
+@pytest.mark.django_db
+def test_audit_ranking(import_season, tmp_path):
+    """Test that a ranking that differs from the replay is reported and can be fixed."""
+    path = tmp_path / "matches.csv"
+    path.write_text(IMPORT_CSV)
+    call_command("import_matches", str(path), "--season", str(import_season.pk))
+    call_command("audit_ranking", stdout=io.StringIO())
+
+    import_season.update_rank(models.Player.objects.get(name="Player 1"), 1)
+    stdout = io.StringIO()
+    with pytest.raises(CommandError, match="ranking of 1 seasons differs"):
+        call_command("audit_ranking", str(import_season.pk), stdout=stdout)
+    assert stdout.getvalue().splitlines() == [
+        "Test Season:",
+        "  Player 2: stored 2, replay 1",
+        "  Player 0: stored 3, replay 2",
+        "  Player 1: stored 1, replay 3",
+    ]
+    call_command("audit_ranking", "--fix", stdout=io.StringIO())
+    assert ranking(import_season) == ["Player 2", "Player 0", "Player 1"]
+    call_command("audit_ranking", stdout=io.StringIO())
+
+
+@pytest.mark.django_db
+def test_audit_ranking_unknown_start():
+    """Test that seasons with players who joined before rank events are left alone."""
+    call_command("loaddata", "examples", verbosity=0)
+    rankings = {season.pk: ranking(season) for season in models.Season.objects.all()}
+    stdout = io.StringIO()
+    call_command("audit_ranking", "--fix", stdout=stdout)
+    lines = stdout.getvalue().splitlines()
+    assert all("skipped" in line for line in lines[: len(rankings)])
+    assert lines[-1] == f"Skipped {len(rankings)} seasons without a known initial order."
+    assert {season.pk: ranking(season) for season in models.Season.objects.all()} == rankings
+
+
+@pytest.mark.django_db
+def test_generate_league():
+    """Test that the league is generated with a ranking history and an unused prefix."""
+    out = io.StringIO()
+    call_command(
+        "generate_league",
+        "--players=6",
+        "--seasons=2",
+        "--matches=40",
+        "--planned=3",
+        "--batch-size=10",
+        stdout=out,
+    )
+    assert "Generated 2 seasons with 6 players" in out.getvalue()
+    season = models.Season.objects.get(name="Synthetic Season 2")
+    assert season.matches.filter(completed=True).count() == 40
+    assert season.matches.filter(completed=False).count() == 3
+    assert models.TimedMatch.objects.filter(season=season).exists()
+    history_steps = season.rank_events.values("timestamp").distinct().count()
+    assert history_steps > 2
+    call_command("audit_ranking", str(season.pk), stdout=io.StringIO())
+
+    with pytest.raises(CommandError, match="use --prefix"):
+        call_command("generate_league", "--players=2", "--matches=1")
+    call_command("generate_league", "--players=2", "--matches=1", "--prefix=Other", stdout=out)
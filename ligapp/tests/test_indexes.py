@@ -0,0 +1,68 @@
+"""Test that the hot queries are planned with their indexes, by checking their EXPLAIN output."""
+
+import pytest
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ligapp.pagination import MatchCursor
+from ligapp.stats import Head2Head
+
+
+def query_plan(queryset) -> str:
+    """The query plan, on PostgreSQL with sequential scans of the tiny test tables disfavored."""
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+
+def sorts(plan: str) -> bool:
+    """Whether the rows are sorted after reading them, only known for SQLite."""
+    return connection.vendor == "sqlite" and "TEMP B-TREE FOR ORDER BY" in plan
+
+
+QUERIES = {
+    "match history": (
+        lambda season, h2h: season.matches.filter(completed=True).order_by("-date_played", "-pk"),
+        "match_season_played_idx",
+    ),
+    "match history page": (
+        lambda season, h2h: (
+            season.matches.filter(completed=True)
+            .filter(MatchCursor(timezone.now(), 1).remaining())
+            .order_by("-date_played", "-pk")
+        ),
+        "match_season_played_idx",
+    ),
+    "latest matches": (
+        lambda season, h2h: season.matches.filter(completed=True).order_by("-date_played")[:10],
+        "match_season_played_idx",
+    ),
+    "ranking replay": (
+        lambda season, h2h: season.matches.filter(completed=True).order_by("date_played", "pk"),
+        "match_season_played_idx",
+    ),
+    "planned matches": (
+        lambda season, h2h: season.matches.filter(completed=False).order_by("date_planned", "pk"),
+        "match_season_planned_idx",
+    ),
+    "head2head matches": (lambda season, h2h: h2h.matches, "match_players_played_idx"),
+    "ranking": (lambda season, h2h: season.ranks.order_by("rank"), "rank_season_rank_idx"),
+    "rank window": (
+        lambda season, h2h: season.ranks.filter(rank__range=(2, 5)),
+        "rank_season_rank_idx",
+    ),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", QUERIES)
+def test_query_uses_index(name, two_player_season, player, other_player, season_admin):
+    """Test that a hot query reads through its index instead of scanning the table."""
+    make_queryset, index = QUERIES[name]
+    h2h = Head2Head(player, other_player, season_admin)
+    plan = query_plan(make_queryset(two_player_season, h2h))
+    assert index in plan, plan
+    if name != "head2head matches":
+        assert not sorts(plan), plan
@@ -0,0 +1,161 @@
+"""Test the server-sent events of season pages."""
+
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory
+from django.test.client import Client
+from django.urls import include, path, reverse
+
+from ligapp import caching, live
+from ligapp import urls as ligapp_urls
+from ligapp.match_builder import MatchBuilder
+from miniliga import urls as project_urls
+
+# The project urls as without the LIGAPP_LIVE_UPDATES setting.
+urlpatterns = [
+    path(
+        "",
+        include(([p for p in ligapp_urls.urlpatterns if p.name != "season-events"], "ligapp")),
+    ),
+    *project_urls.urlpatterns[1:],
+]
+
+
+def record_match(season, winner, loser):
+    MatchBuilder(season=season, first_player=winner, second_player=loser).add_score(21, 10).build()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_season_feed_fan_out(two_player_season, player, other_player, settings):
+    """Test that all subscribers get the same events, loaded once per change."""
+    settings.LIGAPP_LIVE_POLL_INTERVAL = 60
+
+    async def watch():
+        feed = live.SeasonFeed.of_season(two_player_season.pk)
+        queues = [feed.subscribe(), feed.subscribe()]
+        await asyncio.sleep(0.2)  # let the feed take its snapshot
+        await sync_to_async(record_match)(two_player_season, other_player, player)
+        received = [[await asyncio.wait_for(queue.get(), 5) for _ in range(2)] for queue in queues]
+        for queue in queues:
+            feed.unsubscribe(queue)
+        return received
+
+    first, second = async_to_sync(watch)()
+    assert [event.name for event in first] == ["result", "ranking"]
+    assert all(a is b for a, b in zip(first, second, strict=True))
+    assert first[0].data["winner"] == other_player.pk
+    assert [rank["player"]["id"] for rank in first[1].data] == [other_player.pk, player.pk]
+    assert two_player_season.pk not in live.SeasonFeed.feeds
+
+
+@pytest.mark.django_db(transaction=True)
+def test_season_feed_completed_planned_match(two_player_season, player, other_player, settings):
+    """Test that a planned match is published once it is completed, older results are not."""
+    settings.LIGAPP_LIVE_POLL_INTERVAL = 60
+    record_match(two_player_season, player, other_player)
+    planned = MatchBuilder(
+        season=two_player_season, first_player=player, second_player=other_player
+    ).plan()
+
+    def complete():
+        MatchBuilder(first_player=player, second_player=other_player).add_score(21, 5).complete(
+            planned
+        )
+
+    async def watch():
+        feed = live.SeasonFeed.of_season(two_player_season.pk)
+        queue = feed.subscribe()
+        await asyncio.sleep(0.2)
+        await sync_to_async(complete)()
+        event = await asyncio.wait_for(queue.get(), 5)
+        feed.unsubscribe(queue)
+        return event
+
+    event = async_to_sync(watch)()
+    assert (event.name, event.data["id"]) == ("result", planned.pk)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_season_feed_failure(two_player_season, settings, caplog):
+    """Test that a failing feed is logged and ends the streams, after a reload event."""
+    settings.LIGAPP_LIVE_POLL_INTERVAL = 0.05
+
+    async def watch():
+        feed = live.SeasonFeed.of_season(two_player_season.pk)
+
+        def fail():
+            raise RuntimeError("database gone")
+
+        feed._changes = fail
+        stream = live._stream(two_player_season.pk)
+        received = [await anext(stream)]
+        await asyncio.sleep(0.2)
+        await sync_to_async(caching.bump_season_version)(two_player_season.pk)
+        received += [chunk async for chunk in stream]
+        return received
+
+    received = async_to_sync(watch)()
+    assert received == ["retry: 5000\n\n", "event: reload\ndata: null\n\n"]
+    assert "The live feed of season" in caplog.text
+    assert two_player_season.pk not in live.SeasonFeed.feeds
+
+
+def test_slow_subscriber_gets_reload():
+    """Test that a full queue is replaced by a reload event."""
+
+    async def publish():
+        feed = live.SeasonFeed(0)
+        queue = asyncio.Queue(maxsize=2)
+        feed.subscribers.add(queue)
+        feed.publish([live.Event("result", 1), live.Event("result", 2)])
+        feed.publish([live.Event("result", 3)])
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert async_to_sync(publish)() == [live.Event("reload", None)]
+
+
+def test_event_encoding():
+    """Test the wire format of an event."""
+    event = live.Event("ranking", [{"rank": 1}])
+    assert event.encode() == 'event: ranking\ndata: [{"rank": 1}]\n\n'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_season_events_view(two_player_season, season_admin):
+    """Test that the view streams events to users and forbids anonymous requests."""
+
+    async def request(user):
+        async def auser():
+            return user
+
+        http_request = AsyncRequestFactory().get("/events")
+        http_request.auser = auser
+        response = await live.season_events(http_request, pk=two_player_season.pk)
+        if not response.streaming:
+            return response, None
+        stream = aiter(response.streaming_content)
+        first = await anext(stream)
+        await stream.aclose()
+        return response, first
+
+    response, first = async_to_sync(request)(AnonymousUser())
+    assert response.status_code == 403
+    response, first = async_to_sync(request)(season_admin)
+    assert response["Content-Type"] == "text/event-stream"
+    assert first == b"retry: 5000\n\n"
+    assert two_player_season.pk not in live.SeasonFeed.feeds
+
+
+@pytest.mark.django_db
+def test_live_script_needs_events_url(two_player_season, season_admin, settings):
+    """Test that season pages only open the event stream if it is served."""
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse("ligapp:season-detail", kwargs={"pk": two_player_season.pk}) + "?live=1"
+    assert b"EventSource" in client.get(url).content
+
+    settings.ROOT_URLCONF = __name__
+    assert b"EventSource" not in client.get(url).content
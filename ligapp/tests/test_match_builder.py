@@ -0,0 +1,99 @@
+"""Test the write path of the match builder."""
+
+import pytest
+from django.utils import timezone
+
+from ligapp import models
+from ligapp.match_builder import MatchBuilder, bulk_build
+
+
+def three_sets(builder, first_wins):
+    scores = [(21, 10), (10, 21), (21, 5) if first_wins else (5, 21)]
+    for first, second in scores:
+        builder.add_score(first, second)
+    return builder
+
+
+@pytest.mark.django_db
+def test_build_queries(two_player_season, player, other_player, django_assert_num_queries):
+    """
+    Test the queries of recording a match, which do not depend on the number of sets.
+
+    Savepoints included: insert the match, its child row and the sets, read the two ranks,
+    promote the winner (5 queries and 2 savepoints) and update both ratings (3 queries and
+    2 savepoints), with the outer savepoint.
+    """
+    builder = MatchBuilder(
+        season=two_player_season,
+        first_player=other_player,
+        second_player=player,
+        date_played=timezone.now(),
+    )
+    with django_assert_num_queries(17):
+        match = three_sets(builder, first_wins=True).build()
+    assert match.winner_id == other_player.pk
+    assert [rank.player for rank in two_player_season.ranking] == [other_player, player]
+    assert match.sets.count() == 3
+
+    builder = MatchBuilder(
+        season=two_player_season,
+        first_player=other_player,
+        second_player=player,
+        date_played=timezone.now(),
+    )
+    with django_assert_num_queries(11):
+        three_sets(builder, first_wins=True).build()
+    assert [rank.player for rank in two_player_season.ranking] == [other_player, player]
+
+
+@pytest.mark.django_db
+def test_build_without_rank(season, player, other_player):
+    """Test that nothing is saved for players without a rank in the season."""
+    season.add_player(player)
+    builder = MatchBuilder(
+        season=season, first_player=player, second_player=other_player, date_played=timezone.now()
+    )
+    with pytest.raises(models.Rank.DoesNotExist):
+        builder.add_score(21, 10).build()
+    assert not season.matches.exists()
+
+
+@pytest.mark.django_db
+def test_complete_planned_match(two_player_season, player, other_player):
+    """Test completing a planned match like the view does, without giving the season."""
+    planned = MatchBuilder(
+        season=two_player_season, first_player=player, second_player=other_player
+    ).plan()
+    match = (
+        MatchBuilder(first_player=other_player, second_player=player)
+        .add_score(21, 5)
+        .complete(planned)
+    )
+    assert (match.pk, match.completed, match.winner_id) == (planned.pk, True, other_player.pk)
+    assert [rank.player for rank in two_player_season.ranking] == [other_player, player]
+
+
+@pytest.mark.django_db
+def test_bulk_build_fields(two_player_season, player, other_player):
+    """Test that every field of the bulk inserted matches and their child rows is saved."""
+    builders = [
+        MatchBuilder(season=two_player_season, first_player=player, second_player=other_player)
+        .set_date_played(timezone.now())
+        .add_score(21, 10)
+        .add_score(15, 21)
+        .add_score(21, 19),
+        MatchBuilder(season=two_player_season, first_player=other_player, second_player=player)
+        .set_date_played(timezone.now())
+        .make_timed()
+        .set_minutes_played(25)
+        .add_score(30, 41),
+    ]
+    matches = bulk_build(builders)
+    for match in matches:
+        saved = type(match).objects.get(pk=match.pk)
+        fields = [field.attname for field in type(match)._meta.concrete_fields]
+        assert [getattr(saved, name) for name in fields] == [
+            getattr(match, name) for name in fields
+        ]
+    assert (matches[0].winner_id, matches[0].first_sets_won) == (player.pk, 2)
+    assert (matches[1].winner_id, matches[1].minutes_played) == (player.pk, 25)
@@ -0,0 +1,126 @@
+"""Test the Prometheus metrics."""
+
+import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import caches
+from django.http import StreamingHttpResponse
+from django.test.client import AsyncClient, Client, RequestFactory
+from django.urls import resolve, reverse
+from prometheus_client import REGISTRY
+
+from ligapp.match_builder import MatchBuilder
+from ligapp.metrics import MetricsMiddleware
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.fixture
+def staff_client(season_admin):
+    season_admin.is_staff = True
+    season_admin.save()
+    client = Client()
+    client.force_login(season_admin)
+    return client
+
+
+@pytest.mark.django_db
+def test_request_metrics(staff_client, season):
+    """Test that requests are counted and timed by url name, with their queries."""
+    labels = {"view": "ligapp:season-detail"}
+    requests = sample("ligapp_requests_total", status="200", **labels)
+    queries = sample("ligapp_request_db_queries_sum", **labels)
+    staff_client.get(reverse("ligapp:season-detail", kwargs={"pk": season.pk}))
+    assert sample("ligapp_requests_total", status="200", **labels) == requests + 1
+    assert sample("ligapp_request_db_queries_sum", **labels) > queries
+
+    response = staff_client.get(reverse("metrics"))
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+    text = response.content.decode()
+    assert 'ligapp_request_duration_seconds_count{method="GET",view="ligapp:season-detail"}' in text
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_request_metrics(season_admin, season):
+    """Test that requests through the ASGI handler are counted with their queries."""
+    labels = {"view": "ligapp:season-detail"}
+    requests = sample("ligapp_requests_total", status="200", **labels)
+    queries = sample("ligapp_request_db_queries_count", **labels)
+    queries_sum = sample("ligapp_request_db_queries_sum", **labels)
+    client = AsyncClient()
+    client.force_login(season_admin)
+    url = reverse("ligapp:season-detail", kwargs={"pk": season.pk})
+    assert async_to_sync(client.get)(url).status_code == 200
+    assert sample("ligapp_requests_total", status="200", **labels) == requests + 1
+    assert sample("ligapp_request_db_queries_count", **labels) == queries + 1
+    assert sample("ligapp_request_db_queries_sum", **labels) > queries_sum
+
+
+def test_streaming_request_metrics():
+    """Test that streaming responses are counted but not timed."""
+    url = reverse("ligapp:season-detail", kwargs={"pk": 1})
+    labels = {"view": "ligapp:season-detail"}
+
+    async def stream(request):
+        return StreamingHttpResponse(iter(["data"]))
+
+    middleware = MetricsMiddleware(stream)
+    assert iscoroutinefunction(middleware)
+    request = RequestFactory().get(url)
+    request.resolver_match = resolve(url)
+    requests = sample("ligapp_requests_total", status="200", **labels)
+    timed = sample("ligapp_request_duration_seconds_count", method="GET", **labels)
+    assert async_to_sync(middleware)(request).streaming
+    assert sample("ligapp_requests_total", status="200", **labels) == requests + 1
+    assert sample("ligapp_request_duration_seconds_count", method="GET", **labels) == timed
+
+
+@pytest.mark.django_db
+def test_metrics_access(settings, season_admin):
+    """Test that only staff users or scrapers with the token can see the metrics."""
+    client = Client()
+    assert client.get(reverse("metrics")).status_code == 403
+    client.force_login(season_admin)
+    assert client.get(reverse("metrics")).status_code == 403
+
+    settings.LIGAPP_METRICS_TOKEN = "secret"  # noqa: S105
+    client = Client()
+    assert (
+        client.get(reverse("metrics"), headers={"authorization": "Bearer wrong"}).status_code == 403
+    )
+    response = client.get(reverse("metrics"), headers={"authorization": "Bearer secret"})
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_write_metrics(two_player_season, player, other_player):
+    """Test that the write operations are counted and timed."""
+    count = sample("ligapp_write_duration_seconds_count", operation="match_builder.build")
+    updates = sample("ligapp_write_duration_seconds_count", operation="season.update_rank")
+    MatchBuilder(
+        season=two_player_season, first_player=other_player, second_player=player
+    ).add_score(21, 10).build()
+    assert (
+        sample("ligapp_write_duration_seconds_count", operation="match_builder.build") == count + 1
+    )
+    assert sample("ligapp_write_duration_seconds_count", operation="season.update_rank") > updates
+
+
+def test_cache_metrics(settings):
+    """Test that cache hits and misses are counted."""
+    settings.CACHES = {
+        **settings.CACHES,
+        "metrics": {"BACKEND": "ligapp.metrics.LocMemCacheWithMetrics", "LOCATION": "metrics"},
+    }
+    cache = caches["metrics"]
+    labels = {"cache": "LocMemCacheWithMetrics"}
+    hits = sample("ligapp_cache_lookups_total", result="hit", **labels)
+    misses = sample("ligapp_cache_lookups_total", result="miss", **labels)
+    cache.set("a", None)
+    assert cache.get("a", "default") is None
+    assert cache.get("b", "default") == "default"
+    assert cache.get_many(["a", "b", "c"]) == {"a": None}
+    assert sample("ligapp_cache_lookups_total", result="hit", **labels) == hits + 2
+    assert sample("ligapp_cache_lookups_total", result="miss", **labels) == misses + 3
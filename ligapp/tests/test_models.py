@@ -37,21 +37,21 @@ def test_season_end_date_str(season):
 
 @pytest.mark.django_db
 def test_season_add_player(season, player, other_player):
-    """Test that adding a player also adds a rank and history."""
+    """Test that adding a player also adds a rank and a rank event."""
     season.add_player(player)
     assert season.ranks.get(player=player).rank == 1
-    assert season.histories.get(player=player).history[0]["rank"] == 1
+    assert season.rank_events.filter(player=player).first().rank == 1
     season.add_player(other_player)
     assert season.ranks.get(player=other_player).rank == 2
-    assert season.histories.get(player=other_player).history[0]["rank"] == 2
+    assert season.rank_events.filter(player=other_player).first().rank == 2
 
 
 @pytest.mark.django_db
 def test_season_create_player(season):
-    """Test that creating a new player also adds rank and history."""
+    """Test that creating a new player also adds rank and a rank event."""
     ananas = season.create_player(name="Anders Antonsen")
     assert season.ranks.get(player=ananas).rank == 1
-    assert season.histories.get(player=ananas).history[0]["rank"] == 1
+    assert season.rank_events.filter(player=ananas).first().rank == 1
 
 
 @pytest.mark.django_db
@@ -77,11 +77,38 @@ def test_season_rank_up_player(season, player):
         (4, lohky.name),
         (5, ctc.name),
     ]
-    assert [i["rank"] for i in player.histories.get(season=season).history] == [1]
-    assert [i["rank"] for i in lasen.histories.get(season=season).history] == [4, 2]
-    assert [i["rank"] for i in ananas.histories.get(season=season).history] == [2, 3]
-    assert [i["rank"] for i in lohky.histories.get(season=season).history] == [3, 4]
-    assert [i["rank"] for i in ctc.histories.get(season=season).history] == [5]
+    assert list(player.rank_events.filter(season=season).values_list("rank", flat=True)) == [1]
+    assert list(lasen.rank_events.filter(season=season).values_list("rank", flat=True)) == [4, 2]
+    assert list(ananas.rank_events.filter(season=season).values_list("rank", flat=True)) == [2, 3]
+    assert list(lohky.rank_events.filter(season=season).values_list("rank", flat=True)) == [3, 4]
+    assert list(ctc.rank_events.filter(season=season).values_list("rank", flat=True)) == [5]
+
+
+@pytest.mark.django_db
+def test_season_rank_down_player(season, player):
+    """Test that demoting a player shifts the players in between upwards."""
+    season.add_player(player)
+    ananas = season.create_player(name="Anders Antonsen")
+    lohky = season.create_player(name="Loh Kean Yew")
+    season.update_rank(player, 3)
+    assert list(season.ranks.values_list("rank", "player__name")) == [
+        (1, ananas.name),
+        (2, lohky.name),
+        (3, player.name),
+    ]
+    assert list(player.rank_events.filter(season=season).values_list("rank", flat=True)) == [1, 3]
+    assert list(lohky.rank_events.filter(season=season).values_list("rank", flat=True)) == [3, 2]
+
+
+@pytest.mark.django_db
+def test_season_update_rank_queries(season, django_assert_max_num_queries):
+    """Test that the number of queries does not grow with the number of shifted ranks."""
+    players = [season.create_player(name=f"Player {i}") for i in range(40)]
+    with django_assert_max_num_queries(10):
+        season.update_rank(players[-1], 1)
+    assert season.ranks.get(player=players[-1]).rank == 1
+    assert season.ranks.get(player=players[0]).rank == 2
+    assert season.ranks.get(player=players[-2]).rank == 40
 
 
 @pytest.mark.django_db
@@ -95,8 +122,10 @@ def test_timed_match_str(timed_match, get_sets):
 @pytest.mark.django_db
 def test_timed_match_winner(timed_match, get_sets):
     """Test the ``winner`` property of a TimedMatch object."""
+    timed_match.update_result()
     assert timed_match.winner is None
     get_sets(timed_match)[0].save()
+    timed_match.update_result()
     assert timed_match.winner == timed_match.first_player
 
 
@@ -113,9 +142,23 @@ def test_multisetmatch_str(sets_match, get_sets, setup, ref):
 def test_multisetmatch_winner(sets_match, get_sets, setup, ref):
     """Test the ``winner`` property of a MultiSetMatch object in different cases."""
     setup(get_sets(sets_match))
+    sets_match.update_result()
     assert sets_match.winner == ref(sets_match)
 
 
+@pytest.mark.django_db
+def test_multisetmatch_result(sets_match, get_sets, player):
+    """Test that ``update_result`` fills in sets won and points, also from unsaved sets."""
+    sets_match.update_result(get_sets(sets_match))
+    assert sets_match.winner == sets_match.second_player
+    assert (sets_match.first_sets_won, sets_match.second_sets_won) == (1, 2)
+    assert (sets_match.first_points, sets_match.second_points) == (48, 49)
+    sets_match.update_result()
+    assert sets_match.winner is None
+    assert (sets_match.first_sets_won, sets_match.second_sets_won) == (0, 0)
+    assert (sets_match.first_points, sets_match.second_points) == (0, 0)
+
+
 @pytest.mark.django_db
 def test_set_str(sets_match, get_sets):
     """Test the string representation of a Set object."""
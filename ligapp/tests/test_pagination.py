@@ -0,0 +1,85 @@
+"""Test the keyset pagination of the match history."""
+
+from datetime import datetime, timedelta
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ligapp.match_builder import MatchBuilder
+from ligapp.pagination import MatchCursor, match_history_page
+from ligapp.views import SeasonMatchHistoryView
+
+
+@pytest.fixture
+def history(two_player_season, player, other_player):
+    """Record matches with three on every date, newest first."""
+    start = timezone.make_aware(datetime(2000, 1, 1))
+    dates = [start + timedelta(days=i // 3) for i in range(12)]
+    matches = [
+        MatchBuilder(
+            season=two_player_season,
+            first_player=player,
+            second_player=other_player,
+            date_played=date,
+        )
+        .add_score(21, 15)
+        .build()
+        for date in dates
+    ]
+    matches.sort(key=lambda m: (m.date_played, m.pk))
+    yield list(reversed(matches))
+
+
+def test_cursor_roundtrip():
+    """Test that the cursor survives the trip through a URL."""
+    date = timezone.make_aware(datetime(2001, 2, 3, 4, 5, 6, 789))
+    cursor = MatchCursor(date, 12)
+    assert MatchCursor.parse(str(cursor)) == cursor
+    for invalid in [None, "", "abc", "1_2_3", "x_1", "none_3"]:
+        assert MatchCursor.parse(invalid) is None
+
+
+@pytest.mark.django_db
+def test_pages_cover_history(two_player_season, history):
+    """
+    Test that following the cursors visits every match exactly once, in order.
+
+    The pages of 5 split the dates with 3 matches, which the next page tells.
+    """
+    seen = []
+    continued = []
+    cursor = None
+    while True:
+        page = match_history_page(two_player_season, cursor, page_size=5)
+        seen.extend(match for _, group in page.matches_by_date for match in group)
+        continued.append(page.continued)
+        cursor = page.next_cursor
+        if not cursor:
+            break
+    assert [match.pk for match in seen] == [match.pk for match in history]
+    assert continued == [False, True, True]
+
+
+@pytest.mark.django_db
+def test_history_view_pages(two_player_season, season_admin, history, monkeypatch):
+    """Test that deep pages render with as many queries as the first one."""
+    monkeypatch.setattr(SeasonMatchHistoryView, "page_size", 5)
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse("ligapp:season-match-history", kwargs={"pk": two_player_season.pk})
+    query_counts = []
+    pages = 0
+    while url:
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        query_counts.append(len(context))
+        pages += 1
+        assert (b"(continued)" in response.content) == (pages > 1)
+        next_cursor = response.context["history_page"].next_cursor
+        url = f"{response.wsgi_request.path}?before={next_cursor}" if next_cursor else None
+    assert pages == 3
+    assert len(set(query_counts)) == 1
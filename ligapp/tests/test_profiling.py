@@ -0,0 +1,66 @@
+"""Test the opt-in request profiling."""
+
+import pstats
+
+import pytest
+from django.test.client import Client
+from django.urls import reverse
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.LIGAPP_PROFILING = {"directory": str(tmp_path), "max_bytes": 10**9}
+    return tmp_path
+
+
+def profiles(directory):
+    return sorted(directory.glob("*/*.prof"))
+
+
+@pytest.mark.django_db
+def test_profile_requested_by_staff(profile_dir, season, season_admin):
+    """Test that staff users get a profile of the request, keyed by view name."""
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse("ligapp:season-detail", kwargs={"pk": season.pk})
+    client.get(url, headers={"x-profile": "1"})
+    assert not profiles(profile_dir)
+
+    season_admin.is_staff = True
+    season_admin.save()
+    response = client.get(url, headers={"x-profile": "1"})
+    (path,) = profiles(profile_dir)
+    assert path.parent.name == "ligapp-season-detail"
+    assert response["X-Profile-File"] == f"{path.parent.name}/{path.name}"
+    stats = pstats.Stats(str(path))
+    assert any("render" in function for _, _, function in stats.stats)
+
+    client.get(url)
+    assert len(profiles(profile_dir)) == 1
+
+
+@pytest.mark.django_db
+def test_profile_sampled(profile_dir, settings, season, season_admin):
+    """Test that sampled requests are profiled without the header, keeping the newest files."""
+    settings.LIGAPP_PROFILING["sample_rate"] = 1.0
+    client = Client()
+    client.force_login(season_admin)
+    client.get(reverse("ligapp:index"))
+    (first,) = profiles(profile_dir)
+    size = first.stat().st_size
+    settings.LIGAPP_PROFILING["max_bytes"] = size * 2
+    client = Client()
+    client.force_login(season_admin)
+    for _ in range(3):
+        client.get(reverse("ligapp:index"))
+    assert first not in profiles(profile_dir)
+    assert sum(path.stat().st_size for path in profiles(profile_dir)) <= size * 2
+
+
+@pytest.mark.django_db
+def test_profiling_off(settings, tmp_path, season_admin):
+    """Test that nothing is profiled without a directory."""
+    settings.LIGAPP_PROFILING = {"directory": None, "sample_rate": 1.0}
+    client = Client()
+    client.force_login(season_admin)
+    assert "X-Profile-File" not in client.get(reverse("ligapp:index"), headers={"x-profile": "1"})
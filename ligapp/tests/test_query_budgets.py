@@ -0,0 +1,87 @@
+"""Test that every page stays within its query budget as the data grows."""
+
+import pytest
+from django.test.client import Client
+from django.utils import timezone
+
+from ligapp import models
+
+from .query_budget import QUERY_BUDGETS, url_names
+
+
+@pytest.fixture
+def grow(add_matches):
+    """Provide a function adding ``n`` matches of each kind, players and shared seasons."""
+
+    def add(season, player, other_player, n):
+        add_matches(season, player, other_player, n)
+        for i in range(n):
+            season.create_player(name=f"Grown Player {season.next_free_rank} {i}")
+            other = models.Season.objects.create(
+                name=f"Grown Season {i}", start_date=timezone.now()
+            )
+            other.admins.add(*season.admins.all())
+            other.add_player(player)
+            other.add_player(other_player)
+            add_matches(other, player, other_player, 1)
+
+    return add
+
+
+@pytest.fixture
+def league(two_player_season, season_admin, player, other_player, grow):
+    """Provide the objects the pages are about, for the season admin who is also a player."""
+    player.user = season_admin
+    player.save()
+    grow(two_player_season, player, other_player, 1)
+    matches = two_player_season.matches
+    return {
+        "season": two_player_season.pk,
+        "completed_match": matches.filter(completed=True).first().pk,
+        "planned_match": matches.filter(completed=False).first().pk,
+        "player": player.pk,
+        "other_player": other_player.pk,
+    }
+
+
+# The url kwargs by url name and the league objects they take, the default is the season pk.
+URL_KWARGS = {
+    "index": {},
+    "add-season": {},
+    "api-seasons": {},
+    "match-detail": {"pk": "completed_match"},
+    "match-complete": {"match": "planned_match"},
+    "plan-match": {"season": "season"},
+    "new-match": {"season": "season"},
+    "add-player": {"season": "season"},
+    "results-sheet": {"season": "season"},
+    "new-match-as-player": {"season": "season", "player": "player"},
+    "head2head": {"first": "player", "second": "other_player"},
+    "api-head2head": {"first": "player", "second": "other_player"},
+}
+
+
+def test_every_url_has_a_budget():
+    """Test that new views get a query budget."""
+    assert set(QUERY_BUDGETS) == url_names()
+
+
+@pytest.mark.parametrize("url_name", sorted(url_names()))
+@pytest.mark.django_db
+def test_query_budget(
+    url_name,
+    league,
+    season_admin,
+    two_player_season,
+    player,
+    other_player,
+    grow,
+    assert_query_budget,
+):
+    """Test that the page is within budget and does not need more queries for more data."""
+    client = Client()
+    client.force_login(season_admin)
+    kwargs = {key: league[name] for key, name in URL_KWARGS.get(url_name, {"pk": "season"}).items()}
+    few = assert_query_budget(client, url_name, **kwargs)
+    grow(two_player_season, player, other_player, 5)
+    assert assert_query_budget(client, url_name, **kwargs) == few
@@ -0,0 +1,52 @@
+"""Test the in-memory ranking ladder and the season replay."""
+
+import datetime
+
+import pytest
+from django.utils import timezone
+
+from ligapp.match_builder import MatchBuilder
+from ligapp.ranking import Ladder, replay
+
+
+def test_ladder_move():
+    """Test moving players up and down the ladder, reporting everyone who moved."""
+    ladder = Ladder(None, [10, 20, 30, 40, 50])
+    assert ladder.move(40, 2) == {40: 2, 20: 3, 30: 4}
+    assert ladder.order == [10, 40, 20, 30, 50]
+    assert ladder.move(10, 4) == {40: 1, 20: 2, 30: 3, 10: 4}
+    assert ladder.order == [40, 20, 30, 10, 50]
+    assert ladder.move(50, 5) == {}
+    assert ladder.rank(60) == 6
+    assert ladder.changes() == {40: 1, 10: 4, 60: 6}
+
+
+def test_ladder_apply_result():
+    """Test that only a lower ranked winner moves up, to the rank of the loser."""
+    ladder = Ladder(None, [1, 2, 3, 4])
+    assert ladder.apply_result(1, 4, 1) == {}
+    assert ladder.apply_result(2, 4, None) == {}
+    assert ladder.apply_result(2, 4, 4) == {4: 2, 2: 3, 3: 4}
+    assert ladder.order == [1, 4, 2, 3]
+
+
+@pytest.mark.django_db
+def test_replay(season, django_assert_max_num_queries):
+    """Test that replaying the matches reproduces the ranking of recording them one by one."""
+    players = [season.create_player(name=f"Player {i}") for i in range(6)]
+    start = timezone.now()
+    results = [(5, 0), (3, 4), (0, 1), (4, 5), (2, 3), (5, 1), (1, 0)]
+    for day, (winner, loser) in enumerate(results):
+        MatchBuilder(
+            season=season,
+            first_player=players[winner],
+            second_player=players[loser],
+            date_played=start + datetime.timedelta(days=day),
+        ).add_score(21, 15).build()
+    with django_assert_max_num_queries(4):
+        result = replay(season)
+    assert result.ladder.changes() == {}
+    assert result.ladder.order == list(season.ranks.values_list("player_id", flat=True))
+    assert result.ladder.order == [players[i].pk for i in (4, 5, 1, 0, 2, 3)]
+    assert [len(change.ranks) for change in result.history] == [6, 6, 2]
+    assert result.history[-1].ranks == {players[1].pk: 3, players[0].pk: 4}
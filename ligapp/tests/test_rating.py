@@ -0,0 +1,74 @@
+"""Test the Elo skill ratings."""
+
+import datetime
+import io
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from ligapp.match_builder import MatchBuilder
+from ligapp.rating import EloParameters, elo_update, recompute
+
+
+def test_elo_update():
+    """Test that the winner gains what the loser loses, more so for an upset."""
+    parameters = EloParameters()
+    assert elo_update(1500, 1500, 1.0, parameters) == (1516, 1484)
+    assert elo_update(1500, 1500, 0.5, parameters) == (1500, 1500)
+    upset = elo_update(1400, 1600, 1.0, parameters)
+    assert upset[0] - 1400 == pytest.approx(1600 - upset[1])
+    assert upset[0] - 1400 == pytest.approx(24.3, abs=0.1)
+
+
+@pytest.fixture
+def rated_season(season):
+    """Provide a season with four players and a few matches recorded through the builder."""
+    players = [season.create_player(name=f"Player {i}") for i in range(4)]
+    start = timezone.now()
+    for day, (first, second, first_score) in enumerate(
+        [(0, 1, 21), (2, 3, 10), (3, 0, 21), (1, 2, 15), (0, 3, 21)]
+    ):
+        MatchBuilder(
+            season=season,
+            first_player=players[first],
+            second_player=players[second],
+            date_played=start + datetime.timedelta(days=day),
+        ).add_score(first_score, 18).build()
+    yield season
+
+
+def ratings(season):
+    return {r.player.name: (round(r.rating, 6), r.matches_played) for r in season.ratings.all()}
+
+
+@pytest.mark.django_db
+def test_build_updates_ratings(rated_season):
+    """Test that recording matches updates the ratings incrementally, as a recompute would."""
+    incremental = ratings(rated_season)
+    assert incremental["Player 0"][1] == 3
+    assert sum(rating for rating, _ in incremental.values()) == pytest.approx(4 * 1500)
+    assert list(incremental)[0] == "Player 0"
+    recompute(rated_season)
+    assert ratings(rated_season) == incremental
+
+
+@pytest.mark.django_db
+def test_recompute_ratings_command(rated_season, settings, django_assert_max_num_queries):
+    """Test recomputing with other parameters, in a fixed number of queries."""
+    before = ratings(rated_season)
+    with pytest.raises(CommandError):
+        call_command("recompute_ratings", "--k-factor", "16", stdout=io.StringIO())
+    stdout = io.StringIO()
+    call_command("recompute_ratings", "--k-factor", "16", "--dry-run", stdout=stdout)
+    assert ratings(rated_season) == before
+    assert "  Player 0: " in stdout.getvalue()
+
+    settings.LIGAPP_ELO = {"k_factor": 16}
+    call_command("recompute_ratings", stdout=io.StringIO())
+    halved = ratings(rated_season)
+    assert halved["Player 0"][0] - 1500 == pytest.approx((before["Player 0"][0] - 1500) / 2, 0.05)
+    settings.LIGAPP_ELO = {}
+    with django_assert_max_num_queries(8):
+        recompute(rated_season)
+    assert ratings(rated_season) == before
@@ -0,0 +1,122 @@
+"""Test recording a round of matches at once, from builders or a results sheet."""
+
+import datetime
+
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ligapp import models
+from ligapp.match_builder import InvalidBatchError, MatchBuilder, build_round
+
+# (winner, loser) by day, given out of order
+RESULTS = {3: (2, 3), 0: (3, 0), 4: (1, 2), 1: (3, 1), 2: (0, 1), 5: (3, 2)}
+
+
+def make_season(name, n_players=4):
+    season = models.Season.objects.create(name=name, start_date=timezone.now())
+    return season, [season.create_player(name=f"{name} Player {i}") for i in range(n_players)]
+
+
+def builders(season, players, results=RESULTS):
+    start = timezone.now() - datetime.timedelta(days=30)
+    return [
+        MatchBuilder(
+            season=season,
+            first_player=players[winner],
+            second_player=players[loser],
+            date_played=start + datetime.timedelta(days=day),
+        ).add_score(21, 15)
+        for day, (winner, loser) in results.items()
+    ]
+
+
+def standings(season):
+    ranks = [rank.player.name.split()[-1] for rank in season.ranks.order_by("rank")]
+    ratings = {r.player.name.split()[-1]: round(r.rating, 6) for r in season.ratings.all()}
+    return ranks, ratings
+
+
+@pytest.mark.django_db
+def test_build_round_like_one_by_one(django_assert_max_num_queries):
+    """Test that a round ends with the same ranking and ratings as building in date order."""
+    one_by_one, players = make_season("One by one")
+    for builder in sorted(builders(one_by_one, players), key=lambda b: b.date_played):
+        builder.build()
+    at_once, players = make_season("At once")
+    with django_assert_max_num_queries(25):
+        matches = build_round(builders(at_once, players))
+    assert [match.date_played for match in matches] == sorted(m.date_played for m in matches)
+    assert standings(at_once) == standings(one_by_one)
+    assert models.Set.objects.filter(match__season=at_once).count() == len(RESULTS)
+    assert at_once.rank_events.filter(player=players[3]).count() == 2
+
+
+@pytest.mark.django_db
+def test_build_round_queries():
+    """Test that the queries of a round do not grow with the number of its matches."""
+    queries = []
+    for n_rounds in (1, 3):
+        season, players = make_season(f"{n_rounds} rounds")
+        results = {
+            day + len(RESULTS) * n: result
+            for n in range(n_rounds)
+            for day, result in RESULTS.items()
+        }
+        with CaptureQueriesContext(connection) as captured:
+            build_round(builders(season, players, results))
+        queries.append(len(captured))
+    assert queries[0] == queries[1]
+
+
+@pytest.mark.django_db
+def test_build_round_invalid():
+    """Test that every invalid builder is reported and nothing is saved."""
+    season, players = make_season("Invalid")
+    outsider = models.Player.objects.create(name="Outsider")
+    round_ = builders(season, players, {0: (0, 1), 1: (2, 2), 2: (3, 1)})
+    round_[2].second_player = outsider
+    round_.append(MatchBuilder(season=season, first_player=players[0], second_player=players[1]))
+    with pytest.raises(InvalidBatchError) as error:
+        build_round(round_)
+    assert sorted(error.value.errors) == [1, 2, 3]
+    assert len(error.value.errors[3]) == 2
+    assert not season.matches.exists()
+    assert list(season.ranks.values_list("player", flat=True)) == [p.pk for p in players]
+
+
+@pytest.mark.django_db
+def test_results_sheet_view(season, season_admin):
+    """Test recording a pasted sheet, after reporting the invalid rows."""
+    players = [season.create_player(name=f"Sheet Player {i}") for i in range(3)]
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse("ligapp:results-sheet", kwargs={"season": season.pk})
+    sheet = [
+        "first_player\tsecond_player\tfirst_score_1\tsecond_score_1\tfirst_score_2\tsecond_score_2",
+        "Sheet Player 2\tSheet Player 0\t21\t15\t21\t19",
+        "Sheet Player 1\tNobody\t21\t10\t\t",
+        "",
+        "Sheet Player 1\tSheet Player 0\t21\t21\t\t",
+    ]
+    response = client.post(url, {"sheet": "\n".join(sheet)})
+    assert response.status_code == 200
+    assert response.context["form"].errors["sheet"] == [
+        "Row 2, second_player: Unknown player.",
+        "Row 3, first_score_1: Scores in set must be different.",
+        "Row 3, second_score_1: Scores in set must be different.",
+    ]
+    assert not season.matches.exists()
+
+    sheet[2:] = ["Sheet Player 1\tSheet Player 0\t21\t15\t\t"]
+    response = client.post(url, {"sheet": "\n".join(sheet)})
+    assert response.status_code == 302
+    assert [match.score_str for match in season.matches.order_by("pk")] == [
+        "21 : 15, 21 : 19",
+        "21 : 15",
+    ]
+    assert season.matches.first().date_played.date() == timezone.localdate()
+    assert [rank.player for rank in season.ranking] == [players[2], players[1], players[0]]
@@ -0,0 +1,60 @@
+"""Test the season list only shows visible seasons, with a fixed number of queries."""
+
+import pytest
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ligapp import models
+
+
+def make_seasons(prefix, n):
+    return [
+        models.Season.objects.create(name=f"{prefix} {i}", start_date=timezone.now())
+        for i in range(n)
+    ]
+
+
+def list_seasons(user):
+    """Get the listed season names and the number of queries it took."""
+    client = Client()
+    client.force_login(user)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(reverse("ligapp:index"))
+    return {season.name for season in response.context["all_seasons"]}, len(context)
+
+
+@pytest.mark.django_db
+def test_season_list_visible(season_admin, player):
+    """Test that only administered and participated seasons are listed for normal users."""
+    player.user = User.objects.create(username="player")
+    player.save()
+    for season in make_seasons("Admin", 2):
+        season.admins.add(season_admin)
+    for season in make_seasons("Playing", 2):
+        season.add_player(player)
+    make_seasons("Hidden", 2)
+
+    admin_seasons, _ = list_seasons(season_admin)
+    assert admin_seasons == {"Test Season", "Admin 0", "Admin 1"}
+    player_seasons, _ = list_seasons(player.user)
+    assert player_seasons == {"Playing 0", "Playing 1"}
+    staff = User.objects.create(username="staff", is_staff=True)
+    assert len(list_seasons(staff)[0]) == 7
+
+
+@pytest.mark.django_db
+def test_season_list_queries(season_admin):
+    """Test that the number of queries does not depend on the number of seasons."""
+    for season in make_seasons("Admin", 2):
+        season.admins.add(season_admin)
+    _, few = list_seasons(season_admin)
+    for season in make_seasons("More", 20):
+        season.admins.add(season_admin)
+    make_seasons("Hidden", 20)
+    seasons, many = list_seasons(season_admin)
+    assert len(seasons) == 23
+    assert many == few
@@ -0,0 +1,176 @@
+"""Test the season pages render with a fixed number of queries."""
+
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+
+from ligapp import models
+from ligapp.caching import bump_season_version, season_version
+from ligapp.match_builder import MatchBuilder
+
+
+def count_queries(client, url):
+    """Count the queries needed to render the page at ``url`` without cached fragments."""
+    cache.clear()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.parametrize(
+    "url_name", ["ligapp:season-detail", "ligapp:season-match-history", "ligapp:season-ranking"]
+)
+@pytest.mark.django_db
+def test_season_page_queries(
+    url_name, two_player_season, season_admin, player, other_player, add_matches
+):
+    """Test that the number of queries does not grow with the number of matches."""
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse(url_name, kwargs={"pk": two_player_season.pk})
+    add_matches(two_player_season, player, other_player, 2)
+    few = count_queries(client, url)
+    add_matches(two_player_season, player, other_player, 12)
+    for i in range(10):
+        two_player_season.create_player(name=f"Player {i}")
+    assert count_queries(client, url) == few
+
+
+@pytest.mark.django_db
+def test_latest_matches_winners(
+    two_player_season, player, other_player, django_assert_num_queries, add_matches
+):
+    """Test that the preloaded matches are displayed without further queries."""
+    add_matches(two_player_season, player, other_player, 2)
+    with django_assert_num_queries(2):
+        matches = [m for _, group in two_player_season.latest_matches for m in group]
+        winners = [m.winner_id for m in matches]
+        assert [m.child.minutes_played_str for m in matches] == [" (20 minutes)", ""]
+    assert winners == [other_player.pk, player.pk]
+    assert all(isinstance(m, models.Match) for m in matches)
+
+
+@pytest.mark.django_db
+def test_season_detail_fragments_cached(
+    two_player_season,
+    season_admin,
+    player,
+    other_player,
+    django_capture_on_commit_callbacks,
+    add_matches,
+):
+    """Test that the fragments are served from the cache until a write path bumps the version."""
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse("ligapp:season-detail", kwargs={"pk": two_player_season.pk})
+    add_matches(two_player_season, player, other_player, 1)
+    client.get(url)
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert not any("ligapp_match" in query["sql"] for query in context.captured_queries)
+    assert response.content.count(b"match-winner") == 1
+
+    with django_capture_on_commit_callbacks(execute=True):
+        add_matches(two_player_season, player, other_player, 2)
+    assert client.get(url).content.count(b"match-winner") == 3
+
+
+@pytest.mark.django_db
+def test_season_version_bumped_by_write_paths(
+    two_player_season, player, other_player, django_capture_on_commit_callbacks
+):
+    """Test that recording matches and changing the ranking invalidate the season fragments."""
+    versions = [season_version(two_player_season.pk)]
+    with django_capture_on_commit_callbacks(execute=True):
+        MatchBuilder(
+            season=two_player_season, first_player=player, second_player=other_player
+        ).plan()
+    versions.append(season_version(two_player_season.pk))
+    with django_capture_on_commit_callbacks(execute=True):
+        two_player_season.create_player(name="Third Player")
+    versions.append(season_version(two_player_season.pk))
+    with django_capture_on_commit_callbacks(execute=True):
+        two_player_season.update_rank(other_player, 1)
+    versions.append(season_version(two_player_season.pk))
+    assert versions == sorted(set(versions))
+
+
+@pytest.mark.parametrize("url_name", ["ligapp:season-detail", "ligapp:season-ranking"])
+@pytest.mark.django_db
+def test_season_page_not_modified(
+    url_name,
+    two_player_season,
+    season_admin,
+    player,
+    other_player,
+    django_capture_on_commit_callbacks,
+    add_matches,
+):
+    """Test that unchanged pages are answered with 304 without querying the season."""
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse(url_name, kwargs={"pk": two_player_season.pk})
+    response = client.get(url)
+    etag = response["ETag"]
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, headers={"if-none-match": etag})
+    assert response.status_code == 304
+    assert not any("ligapp_" in query["sql"] for query in context.captured_queries)
+
+    other_client = Client()
+    other_client.force_login(User.objects.create(username="other", is_staff=True))
+    assert other_client.get(url, headers={"if-none-match": etag}).status_code == 200
+
+    with django_capture_on_commit_callbacks(execute=True):
+        add_matches(two_player_season, player, other_player, 1)
+    assert client.get(url, headers={"if-none-match": etag}).status_code == 200
+
+
+@pytest.mark.django_db
+def test_season_page_changed_within_a_second(
+    two_player_season, season_admin, django_capture_on_commit_callbacks
+):
+    """Test that a second change within the same second is not answered with 304."""
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse("ligapp:season-detail", kwargs={"pk": two_player_season.pk})
+    with django_capture_on_commit_callbacks(execute=True):
+        bump_season_version(two_player_season.pk)
+    response = client.get(url)
+    assert "Last-Modified" not in response
+    since = http_date()
+    with django_capture_on_commit_callbacks(execute=True):
+        bump_season_version(two_player_season.pk)
+    response = client.get(url, headers={"if-none-match": response["ETag"]})
+    assert response.status_code == 200
+    assert client.get(url, headers={"if-modified-since": since}).status_code == 200
+
+
+@pytest.mark.django_db
+def test_head2head_not_modified(
+    two_player_season,
+    season_admin,
+    player,
+    other_player,
+    django_capture_on_commit_callbacks,
+    add_matches,
+):
+    """Test that the head-to-head page is answered with 304 until the pair plays again."""
+    client = Client()
+    client.force_login(season_admin)
+    url = reverse("ligapp:head2head", kwargs={"first": player.pk, "second": other_player.pk})
+    add_matches(two_player_season, player, other_player, 1)
+    etag = client.get(url)["ETag"]
+    with CaptureQueriesContext(connection) as context:
+        assert client.get(url, headers={"if-none-match": etag}).status_code == 304
+    assert len([q for q in context.captured_queries if "ligapp_" in q["sql"]]) == 2
+
+    with django_capture_on_commit_callbacks(execute=True):
+        add_matches(two_player_season, player, other_player, 1)
+    assert client.get(url, headers={"if-none-match": etag}).status_code == 200
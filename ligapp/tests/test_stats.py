@@ -39,3 +39,52 @@ def test_head2head_nodata(player, other_player, season_admin):
         ("Sets", [(0,), (0,)]),
         ("Points", [(0,), (0,)]),
     ]
+
+
+@pytest.mark.django_db
+def test_head2head_stats_aggregated(
+    two_player_season, season_admin, player, other_player, django_assert_num_queries
+):
+    builder_kwargs = {"season": two_player_season, "date_played": timezone.now()}
+    MatchBuilder(first_player=player, second_player=other_player, **builder_kwargs).add_score(
+        21, 15
+    ).add_score(7, 21).add_score(21, 19).build()
+    MatchBuilder(first_player=other_player, second_player=player, **builder_kwargs).add_score(
+        21, 10
+    ).add_score(21, 12).build()
+    MatchBuilder(
+        first_player=other_player, second_player=player, **builder_kwargs
+    ).make_timed().set_minutes_played(15).add_score(9, 13).build()
+
+    head_to_head = stats.Head2Head(player, other_player, season_admin)
+    with django_assert_num_queries(1):
+        result = head_to_head.stats
+    assert result == [
+        ("Matches", [(2, 2.0 / 3.0 * 100.0), (1, 1.0 / 3.0 * 100.0)]),
+        ("Sets", [(3, 50.0), (3, 50.0)]),
+        ("Points", [(84, 84.0 / 190.0 * 100.0), (106, 106.0 / 190.0 * 100.0)]),
+    ]
+
+
+@pytest.mark.django_db
+def test_head2head_season_stats_queries(
+    season_admin, player, other_player, django_assert_num_queries
+):
+    seasons = []
+    for i in range(5):
+        season = models.Season.objects.create(name=f"Season {i}", start_date=timezone.now())
+        season.admins.add(season_admin)
+        if i % 2:
+            season.add_player(player)
+            season.add_player(other_player)
+        else:
+            season.add_player(other_player)
+            season.add_player(player)
+        seasons.append(season)
+
+    head_to_head = stats.Head2Head(player, other_player, season_admin)
+    with django_assert_num_queries(1):
+        result = head_to_head.season_stats
+    assert sorted(result, key=lambda line: line[0].pk) == [
+        (season, 2 - i % 2, 1 + i % 2) for i, season in enumerate(seasons)
+    ]
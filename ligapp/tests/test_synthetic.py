@@ -0,0 +1,35 @@
+"""Test the synthetic league generator."""
+
+import pytest
+
+from ligapp import models
+from ligapp.ranking import replay
+from ligapp.synthetic import LeagueGenerator, LeagueSize, generate_league
+
+
+@pytest.mark.django_db
+def test_generate_league():
+    """Test that the league has the requested size and a consistent ranking and ratings."""
+    size = LeagueSize(players=6, seasons=2, matches=30, max_sets=5, planned=4)
+    seasons = generate_league(size, prefix="Gen")
+    assert [season.name for season in seasons] == ["Gen Season 1", "Gen Season 2"]
+    for season in seasons:
+        assert season.participants.count() == 6
+        assert season.matches.filter(completed=True).count() == 30
+        assert season.matches.filter(completed=False, date_planned__isnull=False).count() == 4
+        assert not replay(season).ladder.changes()
+        assert sum(season.ratings.values_list("matches_played", flat=True)) == 60
+    multi_set = models.MultiSetMatch.objects.filter(season=seasons[0], completed=True).first()
+    assert max(multi_set.first_sets_won, multi_set.second_sets_won) == 3
+    planned = models.Match.objects.filter(season__in=seasons, completed=False)
+    assert not planned.exclude(**{field: None for field in models.Match.RESULT_FIELDS}).exists()
+
+
+def test_sets_are_regulation():
+    """Test that generated sets have a winner and decide the match."""
+    generator = LeagueGenerator(LeagueSize(max_sets=3, seed=4))
+    for _ in range(50):
+        sets = generator.sets()
+        assert all(first != second and 21 in (first, second) for first, second in sets)
+        wins = sum(first > second for first, second in sets)
+        assert 2 in (wins, len(sets) - wins) and len(sets) <= 3
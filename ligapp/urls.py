@@ -1,13 +1,21 @@
 """Ligapp url configuration."""
 
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import api, async_views, live, views
+
+if getattr(settings, "LIGAPP_ASYNC_VIEWS", False):
+    season_detail_view = async_views.AsyncSeasonDetailView.as_view()
+    head2head_view = async_views.AsyncHead2HeadView.as_view()
+else:
+    season_detail_view = views.SeasonDetailView.as_view()
+    head2head_view = views.Head2HeadView.as_view()
 
 app_name = "ligapp"
 urlpatterns = [
     path("", views.SeasonListView.as_view(), name="index"),
-    path("season/<int:pk>/", views.SeasonDetailView.as_view(), name="season-detail"),
+    path("season/<int:pk>/", season_detail_view, name="season-detail"),
     path(
         "season/<int:pk>/ranking",
         views.SeasonRankingView.as_view(),
@@ -36,14 +44,27 @@ urlpatterns = [
         views.NewPlayerMatchView.as_view(),
         name="new-match-as-player",
     ),
+    path(
+        "season/<int:season>/results-sheet",
+        views.ResultsSheetView.as_view(),
+        name="results-sheet",
+    ),
     path(
         "season/<int:season>/add-player",
         views.AddPlayerView.as_view(),
         name="add-player",
     ),
+    path("head2head/<int:first>/<int:second>", head2head_view, name="head2head"),
+    path("api/seasons", api.seasons, name="api-seasons"),
+    path("api/season/<int:pk>", api.season, name="api-season"),
+    path("api/season/<int:pk>/ranking", api.season_ranking, name="api-season-ranking"),
+    path("api/season/<int:pk>/matches", api.season_matches, name="api-season-matches"),
     path(
-        "head2head/<int:first>/<int:second>",
-        views.Head2HeadView.as_view(),
-        name="head2head",
+        "api/head2head/<int:first>/<int:second>",
+        api.head2head,
+        name="api-head2head",
     ),
 ]
+
+if getattr(settings, "LIGAPP_LIVE_UPDATES", False):
+    urlpatterns.append(path("season/<int:pk>/events", live.season_events, name="season-events"))
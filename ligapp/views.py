@@ -1,8 +1,12 @@
 """Ligapp views."""
 
+import datetime
+from typing import Optional
+
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import (
     CreateView,
     DetailView,
@@ -10,12 +14,16 @@ from django.views.generic import (
     ListView,
     TemplateView,
 )
+from django.views.decorators.http import condition
 from django.views.generic.detail import SingleObjectMixin
 
-from .match_builder import MatchBuilder
+from .caching import season_version
+from .match_builder import MatchBuilder, build_round
 from .match_form import NewMatchForm, NewPlannedMatchForm, NewPlayerMatchForm
 from .models import Match, Player, Season
+from .pagination import MatchCursor, match_history_page
 from .player_form import AddPlayerForm
+from .sheet_form import ResultsSheetForm
 from .stats import Head2Head
 
 
@@ -26,15 +34,77 @@ class SeasonListView(LoginRequiredMixin, ListView):
     model = Season
     context_object_name = "all_seasons"
 
+    def get_queryset(self):
+        """Only list the seasons the user administers or plays in (all of them for staff)."""
+        return Season.objects.for_user(self.request.user)
+
+
+class ConditionalGetMixin:
+    """
+    Answer requests for unchanged pages with 304 Not Modified, before running the view.
+
+    Subclasses provide the validators in ``get_etag`` and ``get_last_modified``. The ETag
+    is combined with the user, as the pages show different actions depending on the user.
+    Must come after ``LoginRequiredMixin``.
+    """
+
+    def get_etag(self, request, *args, **kwargs) -> Optional[str]:
+        return None
+
+    def get_last_modified(self, request, *args, **kwargs) -> Optional[datetime.datetime]:
+        return None
+
+    def _user_etag(self, request, *args, **kwargs) -> Optional[str]:
+        etag = self.get_etag(request, *args, **kwargs)
+        if etag is None:
+            return None
+        return f"{etag}-{request.user.pk}-{int(request.user.is_staff)}"
+
+    def get(self, request, *args, **kwargs):
+        """Run the view only if the client does not have the current page yet."""
+        get = condition(etag_func=self._user_etag, last_modified_func=self.get_last_modified)(
+            super().get
+        )
+        return get(request, *args, **kwargs)
+
+
+class SeasonConditionalGetMixin(ConditionalGetMixin):
+    """
+    Derive the ETag from the season's cache version, without database queries.
+
+    There is no ``Last-Modified``: an HTTP date has whole seconds, so a client revalidating
+    with it would miss a second change within the same second.
+    """
+
+    def get_etag(self, request, *args, **kwargs) -> Optional[str]:
+        return f"{type(self).__name__}-{kwargs['pk']}-{season_version(kwargs['pk'])}"
 
-class SeasonDetailView(LoginRequiredMixin, DetailView):
+
+class SeasonFragmentCacheMixin:
+    """Provide the season's cache version to key the cached template fragments on."""
+
+    fragment_cache_timeout = 60 * 60
+
+    def get_context_data(self, **kwargs):
+        """Add the season version and cache timeout for the cache template tags."""
+        context = super().get_context_data(**kwargs)
+        context["season_version"] = season_version(self.object.pk)
+        context["fragment_cache_timeout"] = self.fragment_cache_timeout
+        return context
+
+
+class SeasonDetailView(
+    LoginRequiredMixin, SeasonConditionalGetMixin, SeasonFragmentCacheMixin, DetailView
+):
     """Display a season."""
 
     model = Season
     context_object_name = "season"
 
 
-class SeasonRankingView(LoginRequiredMixin, DetailView):
+class SeasonRankingView(
+    LoginRequiredMixin, SeasonConditionalGetMixin, SeasonFragmentCacheMixin, DetailView
+):
     """Display the full ranking of the season."""
 
     model = Season
@@ -42,12 +112,26 @@ class SeasonRankingView(LoginRequiredMixin, DetailView):
     context_object_name = "season"
 
 
-class SeasonMatchHistoryView(LoginRequiredMixin, DetailView):
+class SeasonMatchHistoryView(
+    LoginRequiredMixin, SeasonConditionalGetMixin, SeasonFragmentCacheMixin, DetailView
+):
     """Display the full match history of the season."""
 
     model = Season
     template_name = "ligapp/season_match_history.html"
     context_object_name = "season"
+    # matches per page of the cursor pagination, see match_history_page
+    page_size = 50
+
+    def get_context_data(self, **kwargs):
+        """Add the cursor and the (lazily loaded) page of matches before it."""
+        context = super().get_context_data(**kwargs)
+        cursor = MatchCursor.parse(self.request.GET.get("before"))
+        context["cursor"] = cursor
+        context["history_page"] = SimpleLazyObject(
+            lambda: match_history_page(self.object, cursor, self.page_size)
+        )
+        return context
 
 
 class MatchDetailView(LoginRequiredMixin, DetailView):
@@ -323,7 +407,48 @@ class AddPlayerView(UserPassesTestMixin, SingleObjectMixin, FormView):
         return form_kwargs
 
 
-class Head2HeadView(LoginRequiredMixin, TemplateView):
+class ResultsSheetView(UserPassesTestMixin, SingleObjectMixin, FormView):
+    """View for recording a whole round of matches from a pasted results sheet."""
+
+    form_class = ResultsSheetForm
+    template_name = "ligapp/results_sheet_form.html"
+    model = Season
+    pk_url_kwarg = "season"
+    context_object_name = "season"
+
+    def test_func(self):
+        """Make sure the user should be allowed to see this view."""
+        self.object = self.get_object()
+        is_season_admin = self.request.user.season_admin_for.contains(self.object)
+        is_staff = self.request.user.is_staff
+        is_superuser = self.request.user.is_superuser
+        return is_season_admin or is_staff or is_superuser
+
+    def get_form_kwargs(self):
+        """Pass the season on to the form."""
+        form_kwargs = super().get_form_kwargs()
+        form_kwargs.update({"season": self.object})
+        return form_kwargs
+
+    def form_valid(self, form):
+        """Record all the matches of the sheet at once."""
+        build_round(form.cleaned_data["builders"])
+        return super().form_valid(form)
+
+    def get_success_url(self):
+        """URL to redirect to on success."""
+        return reverse("ligapp:season-detail", kwargs={"pk": self.object.pk})
+
+
+class Head2HeadConditionalGetMixin(ConditionalGetMixin):
+    """Derive the ETag from the pair's last match and their shared seasons."""
+
+    def get_etag(self, request, *args, **kwargs) -> Optional[str]:
+        h2h = Head2Head(Player(pk=kwargs["first"]), Player(pk=kwargs["second"]), request.user)
+        return f"head2head-{kwargs['first']}-{kwargs['second']}-{h2h.version()}"
+
+
+class Head2HeadView(LoginRequiredMixin, Head2HeadConditionalGetMixin, TemplateView):
     """Head-to-Head view for two players."""
 
     template_name = "ligapp/head_to_head.html"
@@ -11,6 +11,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 import django_heroku
@@ -48,11 +49,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "ligapp.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "ligapp.profiling.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -90,9 +93,12 @@ DATABASES = {
 
 
 # Caching
+# The default cache is shared by all worker processes on the same machine,
+# so invalidating a season's cached pages in one worker is seen by all of them.
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "BACKEND": "ligapp.metrics.FileBasedCacheWithMetrics",
+        "LOCATION": os.environ.get("MINILIGA_CACHE_DIR", BASE_DIR / ".cache"),
     },
     "select2": {
         "BACKEND": "django.core.cache.backends.db.DatabaseCache",
@@ -148,6 +154,31 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# Serve the season detail and head-to-head pages with async views when running under ASGI,
+# see ligapp.async_views.
+LIGAPP_ASYNC_VIEWS = os.environ.get("MINILIGA_ASYNC_VIEWS", "") == "1"
+
+# Push live updates to season pages opened with ?live=1, see ligapp.live. The event streams
+# stay open for as long as the page, only turn this on when serving with ASGI, for example
+# with "gunicorn miniliga.asgi:application --worker-class uvicorn_worker.UvicornWorker"
+# instead of the WSGI web process of the Procfile: a WSGI worker would be blocked by every
+# open page.
+LIGAPP_LIVE_UPDATES = os.environ.get("MINILIGA_LIVE_UPDATES", "") == "1"
+
+# Seconds between the checks for changes made by other processes, for the live season pages.
+LIGAPP_LIVE_POLL_INTERVAL = float(os.environ.get("MINILIGA_LIVE_POLL_INTERVAL", "2"))
+
+# Profile requests of staff users sending an X-Profile header, and a sample of all requests,
+# if a directory is given. See ligapp.profiling.
+LIGAPP_PROFILING = {
+    "directory": os.environ.get("MINILIGA_PROFILE_DIR"),
+    "sample_rate": float(os.environ.get("MINILIGA_PROFILE_SAMPLE_RATE", "0")),
+    "max_bytes": int(os.environ.get("MINILIGA_PROFILE_MAX_BYTES", 100 * 1024 * 1024)),
+}
+
+# Token Prometheus sends to scrape /metrics, without it only staff users can see the metrics.
+LIGAPP_METRICS_TOKEN = os.environ.get("MINILIGA_METRICS_TOKEN")
+
 # Select2 settings
 
 SELECT2_CACHE_BACKEND = "select2"
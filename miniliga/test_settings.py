@@ -7,3 +7,11 @@ from .settings import *  # noqa: F403  # we want all the settings
 DATABASES["default"]["NAME"] = os.environ.get(  # noqa: F405  # overriding from settings
     "MINILIGA_BROWSER_TEST_DB", "db.tests"
 )
+
+# Keep the tests away from the cache of the development server, they clear it.
+CACHES["default"] = {  # noqa: F405  # overriding from settings
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "tests",
+}
+
+LIGAPP_LIVE_UPDATES = True
@@ -21,6 +21,8 @@ from django.contrib import admin
 from django.contrib.auth import views as auth_views
 from django.urls import include, path
 
+from ligapp.metrics import metrics_view
+
 urlpatterns = [
     path("", include("ligapp.urls")),
     path(
@@ -35,4 +37,5 @@ urlpatterns = [
     ),
     path("admin/", admin.site.urls),
     path("select2/", include("django_select2.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)